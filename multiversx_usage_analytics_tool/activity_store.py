@@ -0,0 +1,106 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Type, TypeVar
+
+from multiversx_usage_analytics_tool.constants import ACTIVITY_STORE_FILE_NAME
+from multiversx_usage_analytics_tool.ecosystem import Organization
+from multiversx_usage_analytics_tool.fetcher import Fetcher
+from multiversx_usage_analytics_tool.utils import get_environment_var
+
+F = TypeVar('F', bound=Fetcher)
+
+# daily activity lists of a generated record, stored as separate metrics
+ACTIVITY_METRICS = ['downloads', 'views']
+
+
+class ActivityStore:
+    def __init__(self, file_name: str = '') -> None:
+        if not file_name:
+            rep_folder = get_environment_var("JSON_FOLDER")
+            file_name = str(Path(rep_folder if rep_folder else ".") / ACTIVITY_STORE_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS packages (
+                report TEXT,
+                organization TEXT,
+                registry TEXT,
+                package TEXT,
+                metadata TEXT,
+                PRIMARY KEY (report, organization, registry, package)
+            );
+            CREATE TABLE IF NOT EXISTS daily_activity (
+                report TEXT,
+                organization TEXT,
+                registry TEXT,
+                package TEXT,
+                metric TEXT,
+                date TEXT,
+                count INTEGER,
+                uniques INTEGER,
+                PRIMARY KEY (report, organization, registry, package, metric, date)
+            );
+            CREATE INDEX IF NOT EXISTS daily_activity_by_date ON daily_activity (report, organization, date);
+        ''')
+
+    def append(self, report_name: str, organization_name: str, organization_data: Dict[str, Any]) -> None:
+        # organization_data has the format generated by Fetcher.to_dict(); days already stored are overwritten
+        package_rows = []
+        activity_rows = []
+        for record in organization_data.get('records', []):
+            metadata: Dict[str, Any] = record.get('metadata', {})
+            registry = metadata.get('section_name', '')
+            package = metadata.get('package_name', '')
+            package_rows.append((report_name, organization_name, registry, package, json.dumps(metadata)))
+            for metric in ACTIVITY_METRICS:
+                activity_rows.extend((report_name, organization_name, registry, package, metric,
+                                      item.get('date'), item.get('downloads', 0), item.get('uniques', 0))
+                                     for item in record.get(metric, []))
+
+        with self.lock, self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?)', package_rows)
+            self.connection.executemany('INSERT OR REPLACE INTO daily_activity VALUES (?, ?, ?, ?, ?, ?, ?, ?)', activity_rows)
+
+    def get_organization_data(self, report_name: str, organization_name: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        # rebuilds the Fetcher.to_dict() format for an arbitrary date range
+        with self.lock:
+            activity_rows = self.connection.execute('''
+                SELECT registry, package, metric, date, count, uniques FROM daily_activity
+                WHERE report = ? AND organization = ? AND date BETWEEN ? AND ?
+                ORDER BY registry, package, metric, date''', (report_name, organization_name, start_date, end_date)).fetchall()
+            package_rows = self.connection.execute('''
+                SELECT registry, package, metadata FROM packages
+                WHERE report = ? AND organization = ?
+                ORDER BY registry, package''', (report_name, organization_name)).fetchall()
+
+        # one record for each stored package, also when it has no activity in the range
+        records: Dict[tuple, Dict[str, Any]] = {}
+        for registry, package, metadata in package_rows:
+            records[(registry, package)] = {'metadata': json.loads(metadata), **{metric: [] for metric in ACTIVITY_METRICS}}
+        for registry, package, metric, date, count, uniques in activity_rows:
+            record = records.setdefault((registry, package), {'metadata': {'section_name': registry, 'package_name': package},
+                                                              **{metric: [] for metric in ACTIVITY_METRICS}})
+            record[metric].append({'date': date, 'downloads': count, 'uniques': uniques})
+
+        result: List[Dict[str, Any]] = list(records.values())
+        for record in result:
+            record['metadata']['no_of_downloads'] = sum(item['downloads'] for item in record['downloads'])
+
+        return {
+            'metadata': {
+                'organization': organization_name,
+                'start_date': start_date,
+                'end_date': end_date,
+            },
+            'records': result
+        }
+
+    def load_fetcher(self, fetcher_class: Type[F], report_name: str, organization: Organization, start_date: str, end_date: str) -> F:
+        organization_data = self.get_organization_data(report_name, organization.name, start_date, end_date)
+        return fetcher_class.from_organization_data(organization_data, organization)
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
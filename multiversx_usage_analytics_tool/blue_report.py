@@ -1,23 +1,32 @@
-from typing import Any, Dict, cast
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import dash
-import plotly.graph_objs as go
-from dash import Input, Output, dcc, html
+from dash import Input, Output, State, dash_table, dcc, html
 
+from multiversx_usage_analytics_tool.constants import (
+    RENDERED_TABS_CACHE_SIZE, REPORT_TABLE_PAGE_SIZE)
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
-from multiversx_usage_analytics_tool.fetcher import Package
-from multiversx_usage_analytics_tool.package_managers_fetcher import (
-    PackageManagersFetcher, PackageManagersPackage)
-from multiversx_usage_analytics_tool.utils import (FormattedDate,
-                                                   PackagesRegistries,
+from multiversx_usage_analytics_tool.package_managers_fetcher import \
+    PackageManagersFetcher
+from multiversx_usage_analytics_tool.report_aggregates import get_rows
+from multiversx_usage_analytics_tool.report_data import (
+    get_data_version, load_report_aggregates)
+from multiversx_usage_analytics_tool.report_graphs import \
+    create_time_series_figure
+from multiversx_usage_analytics_tool.report_tables import get_table_page
+from multiversx_usage_analytics_tool.utils import (PackagesRegistries,
                                                    PackagesRegistry, Reports,
-                                                   get_environment_var)
+                                                   get_environment_var,
+                                                   get_url_selections,
+                                                   is_print_mode)
 
 report_type = Reports.BLUE.value
 
 
-app = dash.Dash(__name__)
+# the downloads table is created by the tab callback, after the initial layout
+app = dash.Dash(__name__, suppress_callback_exceptions=True)
 
 
 def get_layout():
@@ -25,9 +34,12 @@ def get_layout():
     dropdown_options = report_type.get_report_dropdown_options(directory)
     selected_option = dropdown_options[0]['value'] if dropdown_options else None  # Set default value as the newest file generated
     organization_options = [item.value.name for item in EcosystemConfiguration]
+    sections = [repo for repo in PackagesRegistries if report_type in repo.value.reports]
 
     # Layout of the Dash app
     return html.Div(style={'backgroundColor': report_type.repo_color}, children=[
+        # the url query can select the view, e.g. for the pdf export
+        dcc.Location(id='url', refresh=False),
         html.Div(
             style={
                 'display': 'flex',
@@ -45,10 +57,23 @@ def get_layout():
                     clearable=False,
                     style={'width': '35%'}
                 ),
+                dcc.DatePickerRange(id='date-range', display_format='YYYY-MM-DD', clearable=True),
                 dcc.RadioItems(organization_options, organization_options[0], id='organization-selector', inline=True, style={'width': '30%'}),
             ]
         ),
 
+        # only the content of the selected tab is rendered
+        dcc.Tabs(id='registry-selector', value=sections[0].name, children=[
+            dcc.Tab(label=repo.value.repo_name, value=repo.name, id=repo.value.repo_name.replace('.', '-'), style={'font-weight': 'normal'},
+                    selected_style={'font-weight': 'bold'})
+            for repo in sections
+        ],
+            colors={
+            "border": "white",  # Border color
+            "primary": "blue",  # Color of the selected tab
+            "background": "lightgray"  # Color of the unselected tabs
+        }),
+
         # Container for dynamic content
         html.Div(id='report-content')
     ])
@@ -57,119 +82,149 @@ def get_layout():
 app.layout = get_layout
 
 
-def create_table(fetcher: PackageManagersFetcher, section: PackagesRegistry):
-    header_row = html.Thead([
-        html.Th('Package'),
-        html.Th(['Downloads', html.Br(), 'last month']),
-        html.Th(['Downloads', html.Br(), 'last week']),
-        html.Th(['Avg downloads', html.Br(), 'per day']),
-        html.Th(['Libraries.io', html.Br(), 'Score']),
-        html.Th(['Site', html.Br(), ' Score']),
-        html.Th('Site Score Details')
-    ])
-    table_header = [header_row]
-    table_rows = []
-    packages: list[Package] = [item for item in fetcher.packages if item.package_site == section.repo_name]
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    for package in packages:
-        package_statistics = package.create_summary_statistics_from_daily_downloads(fetcher.end_date, report_type.repo_length)
-        row = [
-            html.Td(package.package_name),
-            html.Td(package_statistics['downloads_total'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(package_statistics['downloads_last_week'], style={'textAlign': 'right'}),
-            html.Td(int(package_statistics['avg_daily_downloads']), style={'textAlign': 'right'}),
-            html.Td(package_statistics['libraries_io_score'], id=f"lio_{package.package_name}", style={'textAlign': 'right'}),
-            html.Td(package_statistics['site_score'], style={'textAlign': 'right', 'width': '100px'}),
-            html.Td(' - ' + package_statistics['site_score_details'], style={'textAlign': 'right', })
-        ]
-        table_rows.append(html.Tr(row))
-
-    return html.Table(table_header + table_rows, id='downloads_table', style={
-        'width': '98%',
-        'borderCollapse': 'collapse',
-    })
-
-
-def create_package_info_box(fetcher: PackageManagersFetcher, section: PackagesRegistry):
+TABLE_COLUMNS = [
+    {'name': 'Package', 'id': 'package_name'},
+    {'name': 'Downloads last month', 'id': 'downloads_total', 'type': 'numeric'},
+    {'name': 'Downloads last week', 'id': 'downloads_last_week', 'type': 'numeric'},
+    {'name': 'Avg downloads per day', 'id': 'avg_daily_downloads', 'type': 'numeric'},
+    {'name': 'Libraries.io Score', 'id': 'libraries_io_score', 'type': 'numeric'},
+    {'name': 'Site Score', 'id': 'site_score'},
+    {'name': 'Site Score Details', 'id': 'site_score_details'},
+]
+
+
+def create_table():
+    # the rows are sent one page at a time by update_blue_table
+    return dash_table.DataTable(
+        id='downloads_table',
+        columns=TABLE_COLUMNS,
+        page_action='custom',
+        page_current=0,
+        page_size=REPORT_TABLE_PAGE_SIZE,
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        style_table={'width': '98%'},
+        style_header={'fontWeight': 'bold', 'whiteSpace': 'normal', 'textAlign': 'center'},
+        style_cell={'textAlign': 'right', 'backgroundColor': report_type.repo_color},
+        style_cell_conditional=[
+            {'if': {'column_id': 'package_name'}, 'textAlign': 'left'},
+            {'if': {'column_id': 'site_score'}, 'width': '100px'},
+        ],
+    )
+
+
+def create_table_records(aggregates: Dict[str, Any], section: PackagesRegistry) -> List[Dict[str, Any]]:
+    records = []
+    for package in get_rows(aggregates, section.repo_name):
+        package_statistics = package['statistics']
+        records.append({
+            'package_name': package['package_name'],
+            'downloads_total': package_statistics['downloads_total'],
+            'downloads_last_week': package_statistics['downloads_last_week'],
+            'avg_daily_downloads': int(package_statistics['avg_daily_downloads']),
+            'libraries_io_score': package_statistics['libraries_io_score'],
+            'site_score': package_statistics['site_score'],
+            'site_score_details': ' - ' + package_statistics['site_score_details'],
+        })
+    return records
+
+
+def create_package_info_box(aggregates: Dict[str, Any], section: PackagesRegistry):
     info_boxes = []
-    packages: list[PackageManagersPackage] = [cast(PackageManagersPackage, item) for item in fetcher.packages if item.package_site == section.repo_name]
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-
-    for package in packages:
-        info = package.analyse_libraries_io_score()
-        if info:
+    for package in get_rows(aggregates, section.repo_name):
+        if package['warnings']:
             info_boxes.append(html.Div([
-                html.H3(package.package_name),
-                html.P(info),
+                html.H3(package['package_name']),
+                html.P(package['warnings']),
             ], style={'border': '1px solid #ccc', 'padding': '10px', 'margin': '10px'}))
 
     return html.Div(info_boxes)
 
 
-def create_graph(fetcher: PackageManagersFetcher, section: PackagesRegistry) -> Dict[str, Any]:
-    packages: list[Package] = [item for item in fetcher.packages if item.package_site == section.repo_name]
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    downloads_dict = {p.package_name: {d.date: d.downloads for d in p.downloads} for p in packages}
-    start_date = FormattedDate.from_string(fetcher.start_date)
-    end_date = FormattedDate.from_string(fetcher.end_date)
-    date_range = [str(start_date + x) for x in range(end_date.days_from(start_date) + 1)]
-
-    traces = [
-        go.Scatter(
-            x=date_range,
-            y=[int(downloads_dict[package.package_name].get(d, 0)) for d in date_range],
-            mode='lines+markers',
-            name=package.package_name
-        )
-        for package in packages
-    ]
-
-    return {
-        'data': traces,
-        'layout': go.Layout(
-            title='Daily Downloads Evolution',
-            xaxis={'title': 'Date'},
-            yaxis={'title': 'Downloads'},
-            hovermode='closest'
-        )
-    }
+def create_graph(aggregates: Dict[str, Any], section: PackagesRegistry) -> Dict[str, Any]:
+    return create_time_series_figure(aggregates['dates'], get_rows(aggregates, section.repo_name), 'downloads',
+                                     'Daily Downloads Evolution', 'Downloads')
 
 
 @app.callback(
-    Output('report-content', 'children'),
-    [Input('file-selector', 'value'),
-     Input('organization-selector', 'value')]
+    [Output('file-selector', 'value'),
+     Output('organization-selector', 'value'),
+     Output('registry-selector', 'value')],
+    [Input('url', 'search')],
+    [State('file-selector', 'options')]
 )
-def update_blue_report(selected_file: str, selected_organization: str):
+def select_from_url(search: Optional[str], file_options: List[Dict[str, str]]):
+    # e.g. ?file=blue2024-05-31.json&organization=Multiversx&registry=NPM
+    return get_url_selections(search, {
+        'file': {option['label']: option['value'] for option in file_options},
+        'organization': {item.value.name: item.value.name for item in EcosystemConfiguration},
+        'registry': {repo.name: repo.name for repo in PackagesRegistries if report_type in repo.value.reports},
+    })
+
+
+@lru_cache(RENDERED_TABS_CACHE_SIZE)
+def render_blue_tab(selected_tab: str, selected_file: str, data_version: Tuple[int, int], selected_organization: str,
+                    start_date: Optional[str], end_date: Optional[str]) -> html.Div:
+    # memoized per file version and filters; data_version is only part of the key
     organization = EcosystemConfiguration[selected_organization.upper()].value
-    fetcher = PackageManagersFetcher.from_generated_file(selected_file, organization)
+    repo = PackagesRegistries[selected_tab]
+    aggregates = load_report_aggregates(PackageManagersFetcher, report_type, selected_file, organization, start_date, end_date)
     return html.Div([
-        dcc.Tabs([
-            dcc.Tab(label=repo.value.repo_name, id=repo.value.repo_name.replace('.', '-'), style={'font-weight': 'normal'},
-                    selected_style={'font-weight': 'bold'}, children=[
-                html.H1(f"{organization.name} - {repo.name} Package Downloads"),
-                html.H2('Download Data Table'),
-                create_table(fetcher, repo.value),
-
-                html.H2('Download Trends'),
-                html.Div([
-                    dcc.Graph(
-                        id='downloads-graph',
-                        figure=create_graph(fetcher, repo.value)
-                    ),
-                ], style={'display': 'inline-block', 'width': '95%'}),
-                html.H2('Libraries.io warnings') if organization.report_warnings else None,
-                create_package_info_box(fetcher, repo.value) if organization.report_warnings else None,
-            ])
-            for repo in PackagesRegistries if report_type in repo.value.reports
-        ],
-            colors={
-            "border": "white",  # Border color
-            "primary": "blue",  # Color of the selected tab
-            "background": "lightgray"  # Color of the unselected tabs
-        }),
+        html.H1(f"{organization.name} - {repo.name} Package Downloads"),
+        html.H2('Download Data Table'),
+        create_table(),
+
+        html.H2('Download Trends'),
+        html.Div([
+            dcc.Graph(
+                id='downloads-graph',
+                figure=create_graph(aggregates, repo.value)
+            ),
+        ], style={'display': 'inline-block', 'width': '95%'}),
+        html.H2('Libraries.io warnings') if organization.report_warnings else None,
+        create_package_info_box(aggregates, repo.value) if organization.report_warnings else None,
     ])
 
 
+@app.callback(
+    Output('report-content', 'children'),
+    [Input('registry-selector', 'value'),
+     Input('file-selector', 'value'),
+     Input('organization-selector', 'value'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_blue_report(selected_tab: str, selected_file: str, selected_organization: str, start_date: Optional[str], end_date: Optional[str]):
+    return render_blue_tab(selected_tab, selected_file, get_data_version(selected_file), selected_organization, start_date, end_date)
+
+
+@app.callback(
+    [Output('downloads_table', 'data'),
+     Output('downloads_table', 'page_count'),
+     Output('downloads_table', 'page_current')],
+    [Input('downloads_table', 'page_current'),
+     Input('downloads_table', 'page_size'),
+     Input('downloads_table', 'sort_by'),
+     Input('downloads_table', 'filter_query')],
+    [State('registry-selector', 'value'),
+     State('file-selector', 'value'),
+     State('organization-selector', 'value'),
+     State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('url', 'search')]
+)
+def update_blue_table(page_current: int, page_size: int, sort_by: List[Dict[str, str]], filter_query: str,
+                      selected_tab: str, selected_file: str, selected_organization: str, start_date: Optional[str], end_date: Optional[str],
+                      search: Optional[str]):
+    organization = EcosystemConfiguration[selected_organization.upper()].value
+    aggregates = load_report_aggregates(PackageManagersFetcher, report_type, selected_file, organization, start_date, end_date)
+    records = create_table_records(aggregates, PackagesRegistries[selected_tab].value)
+    # the pdf export prints every row
+    return get_table_page(records, page_current, None if is_print_mode(search) else page_size, sort_by, filter_query)
+
+
 if __name__ == '__main__':
     app.run_server(debug=False, host='0.0.0.0')
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+from multiversx_usage_analytics_tool.factories import Factories
+
+
+@pytest.fixture
+def factories(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Factories:
+    # fetchers read JSON_FOLDER when they are created
+    monkeypatch.setenv('JSON_FOLDER', str(tmp_path))
+    return Factories()
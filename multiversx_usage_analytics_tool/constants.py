@@ -12,20 +12,92 @@ GITHUB_PAGE_SIZE = 100
 
 # HTTP
 NO_OF_RETRIES = 10
-SECONDS_BEFORE_RETRY = 10
+HTTP_POOL_SIZE = 16             # connections kept alive per host
+HTTP_POOLED_HOSTS = 16          # number of hosts for which connection pools are kept
+HTTP_TIMEOUT = (10, 120)        # (connect, read) seconds
+HTTP_GZIP = True                # negotiate gzip compressed responses
+BACKOFF_BASE_SECONDS = 1        # first retry delay, doubled on every retry (with jitter)
+BACKOFF_MAX_SECONDS = 60
+DEFAULT_REQUESTS_PER_SECOND = 20
+HOST_REQUESTS_PER_SECOND = {
+    'libraries.io': 1,          # 60 requests / minute
+    'crates.io': 1,             # crates.io crawler policy
+    'api.github.com': 10,
+}
+
+# HTTP CACHE - (url pattern, seconds a response is used without revalidation); 0 = always revalidated with ETag
+HTTP_CACHE_FILE_NAME = 'http_cache.sqlite'
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+HTTP_CACHE_TTLS = [
+    (r'^https://pypi\.org/pypi/[^/]+/json$', 24 * 3600),
+    (r'^https://libraries\.io/api/.+/sourcerank', 7 * 24 * 3600),
+    (r'^https://snyk\.io/advisor/', 7 * 24 * 3600),
+    (r'^https://api\.github\.com/repos/.+/community/profile$', 24 * 3600),
+    (r'^https://api\.github\.com/', 0),
+]
+
+# ACTIVITY STORE - daily activity of all the gatherings, queried by the reports for custom date ranges
+ACTIVITY_STORE_FILE_NAME = 'activity_store.sqlite'
+
+# SNAPSHOTS - format of the report files written by gather_data (json, json.gz, json.zst or msgpack); all of them are read
+DEFAULT_SNAPSHOT_FORMAT = 'json'
+SNAPSHOT_COMPRESSION_LEVELS = {
+    'json.gz': 6,
+    'json.zst': 10,
+}
+# byte offsets of each organization of a snapshot, in this subfolder of the snapshot folder
+SNAPSHOT_INDEX_FOLDER_NAME = 'index'
+
+# REPORT AGGREGATES - report-ready tables and series, written by gather_data in this subfolder of JSON_FOLDER
+AGGREGATES_FOLDER_NAME = 'aggregates'
+
+# REPORT CACHE - parsed report files kept in memory by the Dash apps (size of the json files on disk is used as estimate)
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# rendered tabs kept by each Dash app, per (file, filters, tab)
+RENDERED_TABS_CACHE_SIZE = 64
+# rows per page of the downloads tables; blue and yellow pages are sorted, filtered and sliced on the server
+REPORT_TABLE_PAGE_SIZE = 50
+
+# GRAPHS - packages drawn separately in large figures (the others are summed in one trace), points per figure from which
+# only these top packages are drawn, points per trace (longer ranges are averaged), points per figure from which WebGL is used,
+# and usage the user agents must exceed to be drawn separately in the yellow report
+GRAPH_TOP_PACKAGES = 20
+GRAPH_TOP_PACKAGES_MIN_POINTS = 5000
+GRAPH_MAX_POINTS = 120
+GRAPH_WEBGL_MIN_POINTS = 1000
+YELLOW_GRAPH_MIN_USAGE = 1000
+
+# PYPI SIMPLE INDEX - local copy of https://pypi.org/simple/, refreshed with conditional requests
+PYPI_SIMPLE_INDEX_FILE_NAME = 'pypi_simple_index.json'
+PYPI_SIMPLE_INDEX_TTL = 24 * 3600
+PYPI_SIMPLE_INDEX_CHUNK_SIZE = 256 * 1024
+
+# CONCURRENCY - number of packages fetched in parallel for each package registry
+NPM_FETCH_WORKERS = 8
+CRATES_FETCH_WORKERS = 4
+PYPI_FETCH_WORKERS = 4
+# kept low to stay within Github's secondary rate limits (concurrent requests / requests per minute)
+GITHUB_FETCH_WORKERS = 4
 
 BLUE_REPORT_PORT = 8050
 GREEN_REPORT_PORT = 8051
 YELLOW_REPORT_PORT = 8052
 
 # PDF SAVE:
-WAIT_FOR_RADIO_COMPONENT_LOAD = 1000
-WAIT_FOR_TABS_COMPONENT_LOAD = 2000
-WAIT_FOR_DROPDOWN_COMPONENT_LOAD = 1000
+# report views (e.g. organization x registry) loaded and printed at the same time, each one in its own browser context
+PDF_CAPTURE_CONCURRENCY = 4
+# milliseconds a report view has to finish loading
+PDF_CAPTURE_TIMEOUT = 60000
 
 # ELASTIC SEARCH
 SCROLL_CONSISTENCY_TIME = "10m"
 REQUEST_TIMEOUT = 600
 SCAN_BATCH_SIZE = 7500
+# user agents per composite aggregation page (each one also carries a bucket per day)
+COMPOSITE_PAGE_SIZE = 1000
 ELASTICSEARCH_MAX_RETRIES = 10
 ELASTICSEARCH_CONNECTIONS_PER_NODE = 64
+# number of date windows aggregated in parallel
+ELASTICSEARCH_FETCH_WORKERS = 4
+# distinct user agents whose classification is memoized
+USER_AGENT_CACHE_SIZE = 65536
@@ -1,19 +1,24 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
-from elastic_transport._response import ObjectApiResponse
-
-from multiversx_usage_analytics_tool.constants import DEFAULT_DATE
+from multiversx_usage_analytics_tool.constants import (
+    DEFAULT_DATE, ELASTICSEARCH_FETCH_WORKERS)
 from multiversx_usage_analytics_tool.ecosystem import Organization
 from multiversx_usage_analytics_tool.fetcher import (DailyActivity, Fetcher,
-                                                     Package)
+                                                     Package,
+                                                     PackageAccumulator)
 from multiversx_usage_analytics_tool.indexer import Indexer
 from multiversx_usage_analytics_tool.utils import (FormattedDate, Index,
                                                    Indexes, Reports,
                                                    UserAgentGroups,
                                                    get_environment_var)
 
+# runtime fields computed by the cluster in server side grouping mode
+USER_AGENT_GROUP_FIELD = 'user_agent_group'
+USER_AGENT_KEY_FIELD = 'user_agent_key'
+
 
 class ElasticSearchDailyActivity(DailyActivity):
+    __slots__ = ()
 
     @staticmethod
     def from_elastic_search_fetched_data(response: Dict[str, Any]) -> 'ElasticSearchDailyActivity':
@@ -29,7 +34,8 @@ class ElasticSearchPackage(Package):
         return ElasticSearchDailyActivity.from_generated_file(item)
 
     @staticmethod
-    def from_aggregate_elastic_search(response: Dict[str, Any]) -> 'ElasticSearchPackage':
+    def from_aggregate_elastic_search(response: Dict[str, Any], package_site: Optional[str] = None) -> 'ElasticSearchPackage':
+        # the user agent is classified here unless its group is given, e.g. computed by the cluster
         result = ElasticSearchPackage()
         raw_downloads = response.get('docs_per_day', {}).get('buckets', [])
 
@@ -37,12 +43,17 @@ class ElasticSearchPackage(Package):
         package_name = response.get('key', '')
         result.package_name = package_name
         result.no_of_downloads = response.get('doc_count', 0)
-        result.package_site = UserAgentGroups.find(package_name)
+        result.package_site = UserAgentGroups.find(package_name) if package_site is None else package_site
 
         return result
 
 
 class ElasticSearchFetcher(Fetcher):
+    def __init__(self) -> None:
+        super().__init__()
+        # user agents are grouped by the cluster, through runtime fields compiled from UserAgentGroups
+        self.server_side_grouping = False
+
     def get_package(self, item: Dict[str, Any]) -> ElasticSearchPackage:
         return ElasticSearchPackage.from_generated_file(item)
 
@@ -50,74 +61,107 @@ class ElasticSearchFetcher(Fetcher):
         raw_downloads = [response[key] for key in response.keys()]
         return [ElasticSearchPackage.from_aggregate_elastic_search(item) for item in raw_downloads]
 
-    def fetch_aggregate_data(self, end_date: str) -> dict[str, Any]:
+    def get_fetch_windows(self, index: Index) -> List[Tuple[FormattedDate, FormattedDate]]:
+        # (start, end) intervals of at most days_to_fetch_in_one_go days, from end_date back to fetch_start_date
+        windows: List[Tuple[FormattedDate, FormattedDate]] = []
+        fetch_start_timestamp = FormattedDate.from_string(self.fetch_start_date)
+        end_timestamp = FormattedDate.from_string(self.end_date)
+        while not end_timestamp < fetch_start_timestamp:
+            start_timestamp = end_timestamp - index.days_to_fetch_in_one_go + 1
+            windows.append((fetch_start_timestamp if start_timestamp < fetch_start_timestamp else start_timestamp, end_timestamp))
+            end_timestamp -= index.days_to_fetch_in_one_go
+        return windows
+
+    def fetch_aggregate_data(self) -> dict[str, Any]:
         indexer = Indexer(
             get_environment_var('ELASTIC_SEARCH_LOGS_URL'),
             get_environment_var('ELASTIC_SEARCH_USER'),
             get_environment_var('ELASTIC_SEARCH_PASSWORD')
         )
 
-        end_timestamp = FormattedDate.from_string(end_date)
         indexes = [Indexes.INGRESS]
-        fetch_dict = {}
+        fetch_dict: Dict[str, Any] = {}
         for index in indexes:
-            fetch_start_date = end_timestamp - index.value.days_to_fetch_in_one_go + 1
-
-            while fetch_start_date > FormattedDate.from_string(self.start_date) - 1:
-                resp = self.fetch_data(indexer, index.value, end_timestamp)
-                end_timestamp -= index.value.days_to_fetch_in_one_go
-                fetch_start_date -= index.value.days_to_fetch_in_one_go
-
-                # merge the results
-                for entry in resp.get("aggregations", {}).get("user_agents", {}).get("buckets", []):
-                    key = entry.get('key', '')
-                    if key not in fetch_dict.keys():
-                        fetch_dict[key] = entry
-                    else:
-                        fetch_dict[key]['doc_count'] += entry['doc_count']
-                        fetch_dict[key]['docs_per_day']['buckets'] += entry['docs_per_day']['buckets']
+            # the windows are independent, so they are aggregated in parallel and merged in window order
+            windows = self.get_fetch_windows(index.value)
+            window_dicts = self.fetch_concurrently(lambda window: self.fetch_data(indexer, index.value, *window), windows, ELASTICSEARCH_FETCH_WORKERS)
+            for window_dict in window_dicts:
+                self.merge_buckets(fetch_dict, window_dict.values())
         return fetch_dict
 
-    def fetch_data(self, indexer: Indexer, index: Index, end_timestamp: FormattedDate) -> ObjectApiResponse[Any]:
+    def fetch_data(self, indexer: Indexer, index: Index, start_timestamp: FormattedDate, end_timestamp: FormattedDate) -> Dict[str, Any]:
+        # the composite aggregation pages are merged as they arrive, keyed by user agent
         index_name = get_environment_var(index.index_name)
-        start_timestamp = end_timestamp - index.days_to_fetch_in_one_go + 1
-        count = indexer.count_records(index_name, start_timestamp, end_timestamp)
-        print(f'fetching from {self.organization.name} {index.index_title} ({start_timestamp} - {end_timestamp}) = {count} documents...')
-        resp = indexer.get_aggregate_records(index_name, start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+        window_dict: Dict[str, Any] = {}
+        count = 0
+        if self.server_side_grouping:
+            pages = indexer.get_composite_aggregate_records(index_name, start_timestamp=start_timestamp, end_timestamp=end_timestamp,
+                                                            aggregate_keys=[USER_AGENT_GROUP_FIELD, USER_AGENT_KEY_FIELD],
+                                                            runtime_mappings=self.get_user_agent_runtime_mappings())
+        else:
+            pages = indexer.get_composite_aggregate_records(index_name, start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+        for page in pages:
+            count = page.get('hits', {}).get('total', {}).get('value', count)
+            buckets = page.get("aggregations", {}).get("user_agents", {}).get("buckets", [])
+            self.merge_buckets(window_dict, [self.get_flat_bucket(bucket) for bucket in buckets])
+        print(f'fetched from {self.organization.name} {index.index_title} ({start_timestamp} - {end_timestamp}) = {count} documents, {len(window_dict)} user agents')
+
+        return window_dict
+
+    def get_flat_bucket(self, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        # composite buckets are keyed by a dict of source values
+        composite_key: Dict[str, Any] = bucket.get('key', {})
+        if self.server_side_grouping:
+            return {**bucket, 'key': composite_key.get(USER_AGENT_KEY_FIELD, ''), 'group': composite_key.get(USER_AGENT_GROUP_FIELD, '')}
+        return {**bucket, 'key': composite_key.get('user_agent', '')}
 
-        return resp
+    @staticmethod
+    def get_user_agent_runtime_mappings() -> Dict[str, Any]:
+        return {
+            USER_AGENT_GROUP_FIELD: {'type': 'keyword', 'script': {'source': UserAgentGroups.get_painless_script(emit_key=False)}},
+            USER_AGENT_KEY_FIELD: {'type': 'keyword', 'script': {'source': UserAgentGroups.get_painless_script(emit_key=True)}},
+        }
 
-    def get_user_agent_grouped_packages(self, raw_packages: List[ElasticSearchPackage]) -> List[ElasticSearchPackage]:
-        def add_or_update_downloads(my_list: List[ElasticSearchDailyActivity], elem: ElasticSearchDailyActivity):
-            if elem.date in [item.date for item in my_list]:
-                existing_item = next(item for item in my_list if item.date == elem.date)
-                existing_item.downloads += elem.downloads
+    @staticmethod
+    def merge_buckets(fetch_dict: Dict[str, Any], buckets: Iterable[Dict[str, Any]]) -> None:
+        for entry in buckets:
+            key = entry.get('key', '')
+            if key not in fetch_dict.keys():
+                fetch_dict[key] = entry
             else:
-                my_list.append(elem)
+                fetch_dict[key]['doc_count'] += entry['doc_count']
+                fetch_dict[key]['docs_per_day']['buckets'] += entry['docs_per_day']['buckets']
 
-        result: List[ElasticSearchPackage] = []
+    def get_server_grouped_packages(self, response: Dict[str, Any]) -> List[ElasticSearchPackage]:
+        # the buckets are already keyed by UserAgentGroups.find() and carry their group, so no user agent is classified here
+        return [ElasticSearchPackage.from_aggregate_elastic_search(entry, package_site=entry.get('group', '')) for entry in response.values()]
 
+    def get_user_agent_grouped_packages(self, raw_packages: List[ElasticSearchPackage]) -> List[ElasticSearchPackage]:
+        accumulator = PackageAccumulator()
         for package in raw_packages:
-            if package.package_site in [item.package_name for item in result]:
-                existing_package = next(item for item in result if item.package_name == package.package_site)
-                existing_package.no_of_downloads += package.no_of_downloads
-                for activity in package.downloads:
-                    add_or_update_downloads(existing_package.downloads, activity)  # type: ignore
-            else:
-                new_package = package
-                new_package.package_name = package.package_site
-                new_package.package_site = UserAgentGroups.get_group(package.package_name).group_name
-                result.append(new_package)
+            # packages are grouped by UserAgentGroups.find()
+            package.package_name = package.package_site
+            package.package_site = UserAgentGroups.get_group(package.package_name).group_name
+            accumulator.add(package.package_name, package)
 
-        return result
+        return cast(List[ElasticSearchPackage], accumulator.to_list())
 
     @staticmethod
-    def from_aggregate_elastic_search(org: Organization, end_date: str) -> 'ElasticSearchFetcher':
+    def from_aggregate_elastic_search(org: Organization, end_date: str, previous: Optional[Fetcher] = None,
+                                      server_side_grouping: bool = False) -> 'ElasticSearchFetcher':
         result = ElasticSearchFetcher()
         result.organization = org
+        result.server_side_grouping = server_side_grouping
         result.end_date = end_date
         result.start_date = str(FormattedDate.from_string(end_date) - Reports.YELLOW.value.repo_length + 1)
-        received_data = result.fetch_aggregate_data(end_date)
-        raw_packages = result.get_user_agent_aggregate_packages(received_data)  # type: ignore
-        result.packages = result.get_user_agent_grouped_packages(raw_packages)  # type: ignore
+        result.set_previous(previous)
+        received_data = result.fetch_aggregate_data()
+        if server_side_grouping:
+            result.packages = result.get_server_grouped_packages(received_data)  # type: ignore
+        else:
+            raw_packages = result.get_user_agent_aggregate_packages(received_data)  # type: ignore
+            result.packages = result.get_user_agent_grouped_packages(raw_packages)  # type: ignore
+
+        # user agents without access in the newly fetched days are kept from the previous snapshot
+        result.merge_previous_packages(keep_missing_packages=True)
         return result
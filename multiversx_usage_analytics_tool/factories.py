@@ -0,0 +1,44 @@
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from multiversx_usage_analytics_tool.ecosystem import Organization
+from multiversx_usage_analytics_tool.fetcher import (DailyActivity, Fetcher,
+                                                     Package)
+
+F = TypeVar('F', bound=Fetcher)
+P = TypeVar('P', bound=Package)
+
+
+class Factories:
+    # the packages, fetchers, snapshot records and report rows the tests start from
+    @staticmethod
+    def package(package_class: Type[P], site: str, name: str, downloads: Dict[str, int], language: str = '') -> P:
+        package = package_class()
+        package.package_site = site
+        package.package_name = name
+        package.package_language = language
+        package.downloads = [DailyActivity(date, count) for date, count in downloads.items()]
+        package.no_of_downloads = sum(downloads.values())
+        return package
+
+    @staticmethod
+    def fetcher(fetcher_class: Type[F], start_date: str, end_date: str, packages: Optional[List[Package]] = None,
+                organization: Optional[Organization] = None) -> F:
+        fetcher = fetcher_class()
+        fetcher.start_date = start_date
+        fetcher.end_date = end_date
+        fetcher.fetch_start_date = start_date
+        fetcher.packages = packages if packages is not None else []
+        if organization is not None:
+            fetcher.organization = organization
+        return fetcher
+
+    @staticmethod
+    def snapshot_record(section: str, name: str) -> Dict[str, Any]:
+        return {'metadata': {'section_name': section, 'package_name': name, 'no_of_downloads': 1},
+                'downloads': [{'date': '2024-05-31', 'downloads': 1, 'uniques': 0}]}
+
+    @staticmethod
+    def report_row(name: str, downloads: List[int], no_of_downloads: Optional[int] = None) -> Dict[str, Any]:
+        # no_of_downloads may cover more days than the series, e.g. in a date range
+        total = sum(downloads) if no_of_downloads is None else no_of_downloads
+        return {'package_name': name, 'no_of_downloads': total, 'series': {'downloads': downloads}}
@@ -1,15 +1,31 @@
-import json
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Sequence
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Sequence,
+                    Tuple, TypeVar, cast)
 
-from multiversx_usage_analytics_tool.constants import (DAYS_IN_WEEK,
-                                                       DEFAULT_DATE)
+import requests
+from tqdm import tqdm
+
+from multiversx_usage_analytics_tool.constants import (DEFAULT_DATE,
+                                                       DEFAULT_SNAPSHOT_FORMAT)
 from multiversx_usage_analytics_tool.ecosystem import Organization
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
+from multiversx_usage_analytics_tool.http_client import get_http_client
+from multiversx_usage_analytics_tool.snapshot import (read_snapshot,
+                                                      read_snapshot_part,
+                                                      write_snapshot)
 from multiversx_usage_analytics_tool.utils import (FormattedDate,
                                                    get_environment_var)
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+# bytes per item of the 'q' (signed 64 bit) arrays of ActivitySeries
+ARRAY_ITEM_SIZE = array('q').itemsize
+
 '''
 in order to allow calculations of scores in future implementations, the score must be a dictionary of individual composite scores
 the general score is calculated as a weighted means of composite scores, which in turn will be weighted means of individual scores.
@@ -47,6 +63,8 @@ class Score:
 
 
 class DailyActivity:
+    __slots__ = ('date', 'downloads', 'uniques')
+
     def __init__(self, date: str = DEFAULT_DATE, count: int = 0, uniques: int = 0) -> None:
         self.date = date
         self.downloads = count
@@ -69,7 +87,68 @@ class DailyActivity:
         return result
 
 
+class ActivitySeries:
+    # dense daily activity of a date range, built from the activity lists of a package for the report series -
+    # counts and uniques as contiguous integer arrays, indexed by the day offset from start_date
+    __slots__ = ('start_date', 'counts', 'uniques')
+
+    def __init__(self, start_date: str = DEFAULT_DATE, length: int = 0) -> None:
+        self.start_date = start_date
+        self.counts = array('q', bytes(ARRAY_ITEM_SIZE * length))
+        self.uniques = array('q', bytes(ARRAY_ITEM_SIZE * length))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def get_dates(self) -> List[str]:
+        start = date.fromisoformat(self.start_date)
+        return [str(start + timedelta(days=offset)) for offset in range(len(self))]
+
+    @classmethod
+    def from_activity(cls, activity: Sequence[DailyActivity], start_date: Optional[str] = None, end_date: Optional[str] = None) -> 'ActivitySeries':
+        # the range defaults to the days covered by the activity; days outside the range are skipped, missing days are 0
+        if start_date is None or end_date is None:
+            if not activity:
+                return cls()
+            dates = [item.date for item in activity]
+            start_date = start_date if start_date is not None else min(dates)
+            end_date = end_date if end_date is not None else max(dates)
+        result = cls(start_date, max(date.fromisoformat(end_date).toordinal() - date.fromisoformat(start_date).toordinal() + 1, 0))
+        start_ordinal = date.fromisoformat(start_date).toordinal()
+        for item in activity:
+            index = date.fromisoformat(item.date).toordinal() - start_ordinal
+            if 0 <= index < len(result):
+                result.counts[index] += item.downloads
+                result.uniques[index] += item.uniques
+        return result
+
+
+class ActivityAccumulator:
+    # daily activity keyed by date - the first item of each date is kept and the counts of the later ones are added to it
+    def __init__(self, activity: Iterable[DailyActivity] = ()) -> None:
+        self.activity_by_date: Dict[str, DailyActivity] = {}
+        self.add_all(activity)
+
+    def add(self, item: DailyActivity) -> None:
+        existing_item = self.activity_by_date.get(item.date)
+        if existing_item is None:
+            self.activity_by_date[item.date] = item
+        else:
+            existing_item.downloads += item.downloads
+
+    def add_all(self, activity: Iterable[DailyActivity]) -> None:
+        for item in activity:
+            self.add(item)
+
+    def to_list(self) -> List[DailyActivity]:
+        # in order of first occurrence
+        return list(self.activity_by_date.values())
+
+
 class Package:
+    # (statistics name, activity attribute, uniques instead of counts) of the summary statistics computed by report_statistics
+    ACTIVITY_METRICS: List[Tuple[str, str, bool]] = [('downloads', 'downloads', False)]
+
     def __init__(self) -> None:
         self.package_name = ''
         self.package_language = ''
@@ -96,21 +175,15 @@ class Package:
             'downloads': [item.to_dict() for item in self.downloads]
         }
 
-    def create_summary_statistics_from_daily_downloads(self, end_date: str, report_duration: int) -> Dict[str, Any]:
-        summary_dict = self.calculate_activity_statistics('downloads', self.downloads, end_date, report_duration)
-        summary_dict['site_score'] = f"{self.site_score.final:.2f}"
-        summary_dict['site_score_details'] = repr(self.site_score)
-        return summary_dict
-
-    def calculate_activity_statistics(self, name: str, activity: Sequence[DailyActivity], end_date: str, report_duration: int) -> Dict[str, Any]:
-        last_month_downloads = sum(dd.downloads for dd in activity)
-        avg_daily_downloads = last_month_downloads / report_duration
-        seven_days_before = str(FormattedDate.from_string(end_date) - DAYS_IN_WEEK + 1)
-        last_week_downloads = sum(dd.downloads for dd in [item for item in activity if item.date >= seven_days_before])
+    def get_warnings(self) -> str:
+        # shown in the warning boxes of the reports, empty if there is nothing to report
+        return ''
+
+    def get_summary_details(self) -> Dict[str, Any]:
+        # summary statistics that do not depend on the daily activity
         return {
-            f"{name}_total": last_month_downloads,
-            f"{name}_last_week": last_week_downloads,
-            f"avg_daily_{name}": avg_daily_downloads,
+            'site_score': f"{self.site_score.final:.2f}",
+            'site_score_details': repr(self.site_score),
         }
 
     def get_daily_activity(self, item: Dict[str, Any]):
@@ -130,10 +203,36 @@ class Package:
         return result
 
 
+class PackageAccumulator:
+    # packages keyed by name - the first package of each name is kept and the activity of the later ones is merged into it
+    def __init__(self) -> None:
+        self.packages: Dict[str, Package] = {}
+        self.activity: Dict[str, ActivityAccumulator] = {}
+
+    def add(self, name: str, package: Package) -> None:
+        existing_package = self.packages.get(name)
+        if existing_package is None:
+            self.packages[name] = package
+            self.activity[name] = ActivityAccumulator(package.downloads)
+        else:
+            existing_package.no_of_downloads += package.no_of_downloads
+            self.activity[name].add_all(package.downloads)
+
+    def to_list(self) -> List[Package]:
+        for name, package in self.packages.items():
+            package.downloads = self.activity[name].to_list()
+        return list(self.packages.values())
+
+
 class Fetcher:
+    # progress bars of the concurrent fetches; turned off when several gathering jobs run in parallel, as their bars would interleave
+    show_progress = True
+
     def __init__(self) -> None:
         self.start_date = ''
         self.end_date = ''
+        self.fetch_start_date = ''      # first day fetched - later than start_date when gathering incrementally
+        self.previous: Optional[Fetcher] = None
         self.packages: List[Package] = []
         self.rep_folder = get_environment_var("JSON_FOLDER")
         self.organization = Organization()
@@ -159,24 +258,85 @@ class Fetcher:
         report_name = Path(self.rep_folder if self.rep_folder else ".") / f"{repo_name}{self.end_date}.txt"
         report_name.write_text(str(self))
 
-    def write_json(self, repo_type: str):
+    def write_json(self, repo_type: str, snapshot_format: str = DEFAULT_SNAPSHOT_FORMAT):
         print("writting json ...")
-        report_name = Path(self.rep_folder if self.rep_folder else ".") / f"{repo_type}{self.end_date}.json"
-        report_name.write_text(json.dumps(self.to_dict(), indent=4))
+        write_snapshot(Path(self.rep_folder if self.rep_folder else ".") / f"{repo_type}{self.end_date}", self.to_dict(), snapshot_format)
 
     def get_package(self, item: Dict[str, Any]) -> Package:
         return Package.from_generated_file(item)
 
+    def set_previous(self, previous: Optional['Fetcher']) -> None:
+        # incremental gathering - only the days after the previous snapshot are fetched, the others are taken from it
+        self.fetch_start_date = self.start_date
+        self.previous = None
+        if previous is None or not previous.packages or previous.start_date > self.start_date:
+            return
+        first_missing_day = str(FormattedDate.from_string(previous.end_date) + 1)
+        if self.start_date <= first_missing_day <= self.end_date:
+            self.previous = previous
+            self.fetch_start_date = first_missing_day
+            print(f"incremental gathering - fetching {self.fetch_start_date} - {self.end_date}")
+
+    def merge_previous_packages(self, keep_missing_packages: bool = False) -> None:
+        if self.previous is None:
+            return
+        packages = {(item.package_site, item.package_name): item for item in self.packages}
+        for previous_package in self.previous.packages:
+            kept_activity = [item for item in previous_package.downloads if self.start_date <= item.date < self.fetch_start_date]
+            package = packages.get((previous_package.package_site, previous_package.package_name))
+            if package is not None:
+                package.downloads = kept_activity + package.downloads
+            elif keep_missing_packages and kept_activity:
+                package = previous_package
+                package.downloads = kept_activity
+                self.packages.append(package)
+            else:
+                continue
+            package.no_of_downloads = sum(item.downloads for item in package.downloads)
+
+    def get_request(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
+        # throttled requests are retried by the shared client, based on the per-host rate limiter
+        return get_http_client().get(url, headers=headers, stream=stream)
+
+    def fetch_concurrently(self, fetch_function: Callable[[T], R], items: Sequence[T], workers: int) -> List[R]:
+        # results keep the order of items, regardless of the order in which the fetches complete
+        results: List[Optional[R]] = [None] * len(items)
+        with tqdm(total=len(items), disable=not self.show_progress) as pbar, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(fetch_function, item): index for index, item in enumerate(items)}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    pbar.update(1)
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return cast(List[R], results)
+
+    def get_report_duration(self) -> int:
+        return FormattedDate.from_string(self.end_date).days_from(FormattedDate.from_string(self.start_date)) + 1
+
     @classmethod
     def from_generated_file(cls, file_name: str, organization: Organization):
-        with open(file_name, 'r') as file:
-            json_data: Dict[str, Any] = json.load(file)
-        result = cls()
+        # only the organization is read from indexed snapshots
+        organization_data: Optional[Dict[str, Any]] = read_snapshot_part(file_name, organization.name)
+        if organization_data is not None:
+            return cls.from_organization_data(organization_data, organization)
+        # any of the snapshot formats, detected from the file
+        json_data: Dict[str, Any] = read_snapshot(file_name)
+        return cls.from_json_data(json_data, organization)
+
+    @classmethod
+    def from_json_data(cls, json_data: Dict[str, Any], organization: Organization):
         organization_data: Dict[str, Any] = json_data.get(organization.name, {})
         # Compatibility with old reports that didn't include organization key
         if not organization_data and EcosystemConfiguration.MULTIVERSX.value.name not in json_data.keys():
             organization_data = json_data if organization.name == EcosystemConfiguration.MULTIVERSX.value.name else {}
+        return cls.from_organization_data(organization_data, organization)
 
+    @classmethod
+    def from_organization_data(cls, organization_data: Dict[str, Any], organization: Organization):
+        result = cls()
+        result.organization = organization
         meta: Dict[str, Any] = organization_data.get('metadata', {})
         result.start_date = meta.get('start_date', DEFAULT_DATE)
         result.end_date = meta.get('end_date', DEFAULT_DATE)
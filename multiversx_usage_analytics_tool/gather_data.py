@@ -1,17 +1,34 @@
 import argparse
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
+from tqdm import tqdm
+
+from multiversx_usage_analytics_tool.activity_store import ActivityStore
+from multiversx_usage_analytics_tool.constants import (DEFAULT_SNAPSHOT_FORMAT,
+                                                       HTTP_CACHE_FILE_NAME)
+from multiversx_usage_analytics_tool.ecosystem import Organization
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
 from multiversx_usage_analytics_tool.elastic_fetcher import \
     ElasticSearchFetcher
+from multiversx_usage_analytics_tool.fetcher import Fetcher
 from multiversx_usage_analytics_tool.github_fetcher import GithubFetcher
+from multiversx_usage_analytics_tool.http_client import get_http_client
 from multiversx_usage_analytics_tool.package_managers_fetcher import \
     PackageManagersFetcher
-from multiversx_usage_analytics_tool.utils import (FormattedDate,
+from multiversx_usage_analytics_tool.report_aggregates import (
+    build_report_aggregates, write_report_aggregates)
+from multiversx_usage_analytics_tool.snapshot import (get_available_formats,
+                                                      write_snapshot)
+from multiversx_usage_analytics_tool.utils import (FormattedDate, Report,
+                                                   Reports,
                                                    get_environment_var)
 
+GatherJob = Tuple[str, Organization, Callable[[Organization, str], Fetcher]]
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -29,6 +46,33 @@ def main():
         type=validate_week,
         help='Runs the script with end_date as sunday of the week provided.'
     )
+    parser.add_argument(
+        '--jobs',
+        type=validate_jobs,
+        default=1,
+        help='Number of (organization, source) gathering jobs run in parallel (default 1 - sequential).'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Fetches only the days after the most recent previously generated json files and merges them with those files.'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Downloads everything again, without using or updating the local HTTP response cache.'
+    )
+    parser.add_argument(
+        '--server-side-grouping',
+        action='store_true',
+        help='Groups the user agents in Elastic search, through runtime fields (requires painless regexes to be enabled on the cluster).'
+    )
+    parser.add_argument(
+        '--format',
+        choices=get_available_formats(),
+        default=DEFAULT_SNAPSHOT_FORMAT,
+        help=f'Format of the generated report files (default {DEFAULT_SNAPSHOT_FORMAT}); the reports read all of them.'
+    )
     args = parser.parse_args()
 
     end_date = FormattedDate.now() - 1
@@ -41,34 +85,78 @@ def main():
     print(end_date.get_week_and_day_string())
 
     rep_folder = get_environment_var("JSON_FOLDER")
-    github_dict_to_write = {}
-    pm_dict_to_write = {}
-    es_dict_to_write = {}
+    if not args.no_cache:
+        get_http_client().enable_cache(str(Path(rep_folder if rep_folder else ".") / HTTP_CACHE_FILE_NAME))
+    organizations = [item.value for item in EcosystemConfiguration if item.value.gather_data]
 
-    # Creates a fetcher for each organization for retrieving package sites info
-    for org in [item.value for item in EcosystemConfiguration if item.value.gather_data]:
-        print()
-        print(org.name)
+    # Creates a fetcher for each organization and source (elastic search, package sites, github)
+    jobs: List[GatherJob] = []
+    for org in organizations:
         if org == EcosystemConfiguration.MULTIVERSX.value:
-            es_fetcher = ElasticSearchFetcher.from_aggregate_elastic_search(org, str(end_date))
-            es_dict_to_write[org.name] = es_fetcher.to_dict()
-        pm_fetcher = PackageManagersFetcher.from_package_sites(org, str(end_date))
-        pm_dict_to_write[org.name] = pm_fetcher.to_dict()
-        git_fetcher = GithubFetcher.from_package_sites(org, str(end_date))
-        github_dict_to_write[org.name] = git_fetcher.to_dict()
+            previous = load_previous_fetcher(ElasticSearchFetcher, Reports.YELLOW.value, org, str(end_date)) if args.incremental else None
+            fetch_function = partial(ElasticSearchFetcher.from_aggregate_elastic_search, previous=previous, server_side_grouping=args.server_side_grouping)
+            jobs.append((Reports.YELLOW.value.repo_name, org, fetch_function))
+        previous = load_previous_fetcher(PackageManagersFetcher, Reports.BLUE.value, org, str(end_date)) if args.incremental else None
+        jobs.append((Reports.BLUE.value.repo_name, org, partial(PackageManagersFetcher.from_package_sites, previous=previous)))
+        # github traffic pages always return the whole two weeks window, so there is nothing to gather incrementally
+        jobs.append((Reports.GREEN.value.repo_name, org, GithubFetcher.from_package_sites))
+
+    # parallel jobs only show one progress bar for all the jobs, and their summaries are printed here as they complete
+    Fetcher.show_progress = args.jobs == 1
+    gathered: Dict[str, Dict[str, Any]] = {report.value.repo_name: {} for report in Reports}
+    aggregates: Dict[str, Dict[str, Any]] = {report.value.repo_name: {} for report in Reports}
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor, tqdm(total=len(jobs), disable=args.jobs == 1) as pbar:
+        futures = {executor.submit(run_gather_job, job, str(end_date)): job for job in jobs}
+        for future in as_completed(futures):
+            report_name, org, _ = futures[future]
+            gathered[report_name][org.name], aggregates[report_name][org.name] = future.result()
+            pbar.write(f"{org.name} - {report_name} report data gathered - {len(gathered[report_name][org.name]['records'])} packages")
+            pbar.update(1)
 
     print("writting json ...")
 
-    pm_report_name = Path(rep_folder if rep_folder else ".") / f"blue{end_date}.json"
-    pm_report_name.write_text(json.dumps(pm_dict_to_write, indent=4))
-
-    github_report_name = Path(rep_folder if rep_folder else ".") / f"green{end_date}.json"
-    github_report_name.write_text(json.dumps(github_dict_to_write, indent=4))
+    # keep the organizations in configuration order, regardless of the order in which the jobs completed
+    for report_name, gathered_data in gathered.items():
+        dict_to_write = {org.name: gathered_data[org.name] for org in organizations if org.name in gathered_data}
+        report_file_name = write_snapshot(Path(rep_folder if rep_folder else ".") / f"{report_name}{end_date}", dict_to_write, args.format, indexed=True)
+        write_report_aggregates(str(report_file_name), {org.name: aggregates[report_name][org.name] for org in organizations if org.name in gathered_data})
+
+    print("appending to the activity store ...")
+    store = ActivityStore()
+    for report_name, gathered_data in gathered.items():
+        for org_name, org_data in gathered_data.items():
+            store.append(report_name, org_name, org_data)
+    store.close()
+
+    print()
+    print('HTTP connections:')
+    print(get_http_client().statistics)
+    print('Rate limiting:')
+    print(get_http_client().rate_limiter)
+    if get_http_client().cache is not None:
+        print('HTTP cache:')
+        print(get_http_client().cache)
+    print('Data gathered successfully')
 
-    el_report_name = Path(rep_folder if rep_folder else ".") / f"yellow{end_date}.json"
-    el_report_name.write_text(json.dumps(es_dict_to_write, indent=4))
 
-    print('Data gathered successfully')
+def load_previous_fetcher(fetcher_class: Type[Fetcher], report: Report, org: Organization, end_date: str) -> Optional[Fetcher]:
+    rep_folder = get_environment_var("JSON_FOLDER")
+    previous_file = report.get_previous_snapshot(rep_folder if rep_folder else ".", end_date)
+    if previous_file is None:
+        return None
+    print(f"{org.name} - {report.repo_name} report - previous data from {previous_file.name}")
+    return fetcher_class.from_generated_file(str(previous_file), org)
+
+
+def run_gather_job(job: GatherJob, end_date: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # returns the snapshot data and the report aggregates of the organization
+    report_name, org, fetch_function = job
+    if Fetcher.show_progress:
+        # the start of a job is only shown when the jobs run one at a time
+        print()
+        print(f"{org.name} - gathering {report_name} report data ...")
+    fetcher = fetch_function(org, end_date)
+    return fetcher.to_dict(), build_report_aggregates(fetcher)
 
 
 def validate_date(date_str: str):
@@ -93,5 +181,15 @@ def validate_week(week_str: str):
         raise argparse.ArgumentTypeError(f"Not a valid week number: '{week_no}'. Expected number between 0 and {max_week_no}")
 
 
+def validate_jobs(jobs_str: str):
+    try:
+        jobs = int(jobs_str)
+        if jobs < 1:
+            raise ValueError()
+        return jobs
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a valid number of jobs: '{jobs_str}'. Expected a positive integer.")
+
+
 if __name__ == "__main__":
     main()
@@ -1,12 +1,11 @@
 from http import HTTPStatus
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, List, Optional, cast
 
 import requests
-from tqdm import tqdm
 
 from multiversx_usage_analytics_tool.constants import (
-    DAYS_IN_TWO_WEEKS_REPORT, DEFAULT_DATE, GITHUB_OWN_ORGANIZATION,
-    GITHUB_PAGE_SIZE)
+    DAYS_IN_TWO_WEEKS_REPORT, DEFAULT_DATE, DEFAULT_SNAPSHOT_FORMAT,
+    GITHUB_FETCH_WORKERS, GITHUB_OWN_ORGANIZATION, GITHUB_PAGE_SIZE)
 from multiversx_usage_analytics_tool.ecosystem import Organization
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
@@ -19,6 +18,8 @@ from multiversx_usage_analytics_tool.utils import (FormattedDate, Language,
 
 
 class GithubDailyActivity(DailyActivity):
+    __slots__ = ()
+
     def __init__(self, date: str = DEFAULT_DATE, count: int = 0, uniques: int = 0) -> None:
         super().__init__(date, count)
         self.uniques = uniques
@@ -49,6 +50,10 @@ class GithubDailyActivity(DailyActivity):
 
 
 class GithubPackage(Package):
+    # clones and visits - counts and uniques
+    ACTIVITY_METRICS = [('downloads', 'downloads', False), ('downloaders', 'downloads', True),
+                        ('visits', 'views', False), ('visitors', 'views', True)]
+
     def __init__(self) -> None:
         super().__init__()
         self.main_page_statistics: Dict[str, Any] = {}
@@ -60,21 +65,13 @@ class GithubPackage(Package):
         temp_dict['views'] = [item.to_dict() for item in self.views]
         return temp_dict
 
-    def create_summary_statistics_from_daily_downloads(self, end_date: str, report_duration=DAYS_IN_TWO_WEEKS_REPORT) -> Dict[str, Any]:
-        temp_summary: Dict[str, Any] = {}
-        # clones - count, score etc.
-        summary: Dict[str, Any] = super().create_summary_statistics_from_daily_downloads(end_date, report_duration)
-        # clones - uniques
-        temp_list = [DailyActivity(item.date, item.uniques) for item in self.downloads]
-        temp_summary = self.calculate_activity_statistics('downloaders', temp_list, end_date, report_duration)
-        summary.update(temp_summary)
-        # visits - count
-        temp_summary = self.calculate_activity_statistics('visits', self.views, end_date, report_duration)
-        summary.update(temp_summary)
-        # visits - uniques
-        temp_list = [DailyActivity(item.date, item.uniques) for item in self.views]
-        temp_summary = self.calculate_activity_statistics('visitors', temp_list, end_date, report_duration)
-        summary.update(temp_summary)
+    def get_warnings(self) -> str:
+        return self.analyse_package()
+
+    def get_summary_details(self) -> Dict[str, Any]:
+        summary = super().get_summary_details()
+        for key in ['forks_count', 'stargazers_count', 'watchers_count']:
+            summary[key] = int(self.main_page_statistics.get(key, 0))
         return summary
 
     def analyse_package(self) -> str:
@@ -113,12 +110,13 @@ class GithubFetcher(Fetcher):
     def __init__(self) -> None:
         super().__init__()
         self.forbidden_traffic_access_packages = []
+        self.github_headers: Dict[str, str] = {}
 
     def write_report(self, repo_name: str = 'rep'):
         return super().write_report(repo_name)
 
-    def write_json(self, repo_type=Reports.GREEN.value.repo_name) -> None:
-        super().write_json(repo_type)
+    def write_json(self, repo_type=Reports.GREEN.value.repo_name, snapshot_format: str = DEFAULT_SNAPSHOT_FORMAT) -> None:
+        super().write_json(repo_type, snapshot_format)
 
     def get_package(self, item: Dict[str, Any]) -> GithubPackage:
         return GithubPackage.from_generated_file(item)
@@ -145,6 +143,15 @@ class GithubFetcher(Fetcher):
             "Accept": "application/vnd.github.v3+json"
         }
 
+    def get_github_headers(self) -> Dict[str, str]:
+        # the authorization header is built once and shared by all the requests of the fetcher
+        if not self.github_headers:
+            self.github_headers = self._get_github_authorization_header()
+        return self.github_headers
+
+    def get_request(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
+        return super().get_request(url, {**self.get_github_headers(), **(headers or {})}, stream)
+
     def get_github_package_names(self) -> Dict[str, Any]:        # github api - query search result
         page = 0
         size = GITHUB_PAGE_SIZE
@@ -152,7 +159,7 @@ class GithubFetcher(Fetcher):
 
         while True:
             url = self.organization.get_search_url_string(PackagesRegistries.GITHUB.value, page)
-            response = requests.get(url, headers=self._get_github_authorization_header())
+            response = self.get_request(url)
 
             response.raise_for_status()
             data = response.json()
@@ -167,7 +174,7 @@ class GithubFetcher(Fetcher):
 
     def fetch_github_downloads(self, package_name: str) -> Dict[str, Any]:
         url = f'{self.organization.get_downloads_url_string(PackagesRegistries.GITHUB.value, package_name)}/clones'
-        response = requests.get(url, headers=self._get_github_authorization_header())
+        response = self.get_request(url)
 
         if response.status_code in [HTTPStatus.FORBIDDEN, HTTPStatus.UNAUTHORIZED]:
             self.forbidden_traffic_access_packages.append(package_name)
@@ -177,7 +184,7 @@ class GithubFetcher(Fetcher):
 
     def fetch_github_visits(self, package_name: str) -> Dict[str, Any]:
         url = f'{self.organization.get_downloads_url_string(PackagesRegistries.GITHUB.value, package_name)}/views'
-        response = requests.get(url, headers=self._get_github_authorization_header())
+        response = self.get_request(url)
 
         if response.status_code == HTTPStatus.FORBIDDEN:
             pass    # already logged from downloads
@@ -188,7 +195,7 @@ class GithubFetcher(Fetcher):
     def fetch_github_package_community_score(self, package_name: str) -> Dict[str, Any]:
         score = {}
         url = f"https://api.github.com/repos/{package_name}/community/profile"
-        response = requests.get(url, headers=self._get_github_authorization_header())
+        response = self.get_request(url)
         if response.status_code == HTTPStatus.NOT_FOUND:
             print(f'{package_name} - community_profile not found')
         else:
@@ -225,6 +232,19 @@ class GithubFetcher(Fetcher):
         else:
             return packet_language
 
+    def fetch_github_package(self, package_name: str, main_page_statistics: Dict[str, Any], with_traffic: bool) -> GithubPackage:
+        fetched_downloads = self.fetch_github_downloads(package_name) if with_traffic else {}
+        fetched_visits = self.fetch_github_visits(package_name) if with_traffic else {}
+        fetched = {"downloads": fetched_downloads, "visits": fetched_visits}
+        packet_language = self.github_package_language(package_name, main_page_statistics['language'])
+
+        package_downloads = GithubPackage.from_github_fetched_data(
+            package_name, packet_language.lang_name, fetched)
+        package_downloads.main_page_statistics = main_page_statistics
+        if not package_downloads.main_page_statistics['is_forked']:
+            package_downloads.site_score = Score.from_dict(self.fetch_github_package_community_score(package_name))
+        return package_downloads
+
     @staticmethod
     def from_package_sites(organization: Organization, end_date: str) -> 'GithubFetcher':
         result = GithubFetcher()
@@ -235,26 +255,14 @@ class GithubFetcher(Fetcher):
 
         print("fetching from github ...")
         packages = result.get_github_package_names()
-
-        with tqdm(total=len(packages)) as pbar:
-            for package_name in packages.keys():
-                fetched_downloads = result.fetch_github_downloads(package_name) if organization == my_organization else {}
-                fetched_visits = result.fetch_github_visits(package_name) if organization == my_organization else {}
-                fetched = {"downloads": fetched_downloads, "visits": fetched_visits}
-                packet_language = result.github_package_language(package_name, packages[package_name]['language'])
-
-                package_downloads = GithubPackage.from_github_fetched_data(
-                    package_name, packet_language.lang_name, fetched)
-                package_downloads.main_page_statistics = packages[package_name]
-                if not package_downloads.main_page_statistics['is_forked']:
-                    package_downloads.site_score = Score.from_dict(result.fetch_github_package_community_score(package_name))
-                result.packages.append(package_downloads)
-                pbar.update(1)
+        result.packages.extend(result.fetch_concurrently(
+            lambda package_name: result.fetch_github_package(package_name, packages[package_name], organization == my_organization),
+            list(packages.keys()), GITHUB_FETCH_WORKERS))
 
         if organization == my_organization and result.forbidden_traffic_access_packages:
             print()
             print("Packages that didn't allow access to traffic information: ")
-            for package_name in result.forbidden_traffic_access_packages:
+            for package_name in sorted(result.forbidden_traffic_access_packages):
                 print(package_name)
             print()
         return result
@@ -1,20 +1,50 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import dash
-import plotly.graph_objs as go
-from dash import Input, Output, dcc, html
+from dash import MATCH, Input, Output, State, dash_table, dcc, html
 
+from multiversx_usage_analytics_tool.constants import (
+    RENDERED_TABS_CACHE_SIZE, REPORT_TABLE_PAGE_SIZE)
+from multiversx_usage_analytics_tool.ecosystem import Organization
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
-from multiversx_usage_analytics_tool.github_fetcher import (GithubFetcher,
-                                                            GithubPackage)
-from multiversx_usage_analytics_tool.utils import (FormattedDate, Languages,
+from multiversx_usage_analytics_tool.github_fetcher import GithubFetcher
+from multiversx_usage_analytics_tool.report_aggregates import (ALL_LANGUAGES,
+                                                               get_rows)
+from multiversx_usage_analytics_tool.report_data import (
+    get_data_version, load_report_aggregates)
+from multiversx_usage_analytics_tool.report_graphs import \
+    create_time_series_figure
+from multiversx_usage_analytics_tool.utils import (Languages,
                                                    PackagesRegistries,
                                                    PackagesRegistry, Reports,
-                                                   get_environment_var)
+                                                   get_environment_var,
+                                                   get_url_selections)
 
 report_type = Reports.GREEN.value
 
+# multi-row headers of the downloads table; the header cells repeated on consecutive columns are merged
+TABLE_COLUMNS = [
+    {'name': ['', '', 'Package'], 'id': 'package_name'},
+    {'name': ['Clones', 'Total', 'Downloads'], 'id': 'downloads_total', 'type': 'numeric'},
+    {'name': ['Clones', 'Total', 'Downloaders'], 'id': 'downloaders_total', 'type': 'numeric'},
+    {'name': ['Clones', 'Last Week', 'Downloads'], 'id': 'downloads_last_week', 'type': 'numeric'},
+    {'name': ['Clones', 'Last Week', 'Downloaders'], 'id': 'downloaders_last_week', 'type': 'numeric'},
+    {'name': ['Clones', 'Avg Daily', 'Downloads'], 'id': 'avg_daily_downloads', 'type': 'numeric'},
+    {'name': ['Visits', 'Total', 'Visits'], 'id': 'visits_total', 'type': 'numeric'},
+    {'name': ['Visits', 'Total', 'Visitors'], 'id': 'visitors_total', 'type': 'numeric'},
+    {'name': ['Visits', 'Last Week', 'Visits'], 'id': 'visits_last_week', 'type': 'numeric'},
+    {'name': ['Visits', 'Last Week', 'Visitors'], 'id': 'visitors_last_week', 'type': 'numeric'},
+    {'name': ['Visits', 'Avg Daily', 'Visits'], 'id': 'avg_daily_visits', 'type': 'numeric'},
+    {'name': ['', '', 'No of Forks'], 'id': 'forks_count', 'type': 'numeric'},
+    {'name': ['', '', 'No of Stars'], 'id': 'stargazers_count', 'type': 'numeric'},
+    {'name': ['', '', 'Watchers'], 'id': 'watchers_count', 'type': 'numeric'},
+    {'name': ['', '', 'Site score'], 'id': 'site_score'},
+]
+# averages are shown as whole numbers
+TRUNCATED_STATISTICS = ['avg_daily_downloads', 'avg_daily_visits']
+
 
 app = dash.Dash(__name__)
 
@@ -27,6 +57,8 @@ def get_layout():
 
     # Layout of the Dash app
     return html.Div(style={'backgroundColor': report_type.repo_color}, children=[
+        # the url query can select the view, e.g. for the pdf export
+        dcc.Location(id='url', refresh=False),
         html.Div(
             style={
                 'display': 'flex',
@@ -44,10 +76,23 @@ def get_layout():
                     clearable=False,
                     style={'width': '35%'}
                 ),
+                dcc.DatePickerRange(id='date-range', display_format='YYYY-MM-DD', clearable=True),
                 dcc.RadioItems(language_options, 'All', id='language-filter', inline=True, style={'width': '40%'}),
             ]
         ),
 
+        # only the content of the selected tab is rendered
+        dcc.Tabs(id="org-selector", value=list(EcosystemConfiguration)[0].name, children=[
+            dcc.Tab(label=org.value.name, value=org.name, id=org.value.name, style={'font-weight': 'normal'},
+                    selected_style={'font-weight': 'bold'})
+            for org in EcosystemConfiguration
+        ],
+            colors={
+            "border": "white",  # Border color
+            "primary": "blue",  # Color of the selected tab
+            "background": "lightgray"  # Color of the unselected tabs
+        }),
+
         # Container for dynamic content
         html.Div(id='report-content')
     ])
@@ -56,194 +101,151 @@ def get_layout():
 app.layout = get_layout
 
 
-def create_table(fetcher: GithubFetcher, section: PackagesRegistry, language: str):
-    header_row = html.Thead([
-        html.Tr([
-            html.Th('Package', rowSpan=3),
-            html.Th('Clones', colSpan=5),
-            html.Th('Visits', colSpan=5),
-            html.Th('No of Forks', rowSpan=3),
-            html.Th('No of Stars', rowSpan=3),
-            html.Th('Watchers', rowSpan=3),
-            html.Th('Site score', rowSpan=3),
-        ]),
-        html.Tr([
-            # Clones
-            html.Th('Total', colSpan=2),
-            html.Th('Last Week', colSpan=2),
-            html.Th(['Avg Daily', html.Br(), 'Downloads'], rowSpan=2),
-            # Visits
-            html.Th('Total', colSpan=2),
-            html.Th('Last Week', colSpan=2),
-            html.Th(['Avg Daily', html.Br(), 'Visits'], rowSpan=2),
-        ]),
-        html.Tr([
-            # Clones Total
-            html.Th('Downloads'),
-            html.Th('Downloaders'),
-            # Clones Last Week
-            html.Th('Downloads'),
-            html.Th('Downloaders'),
-            # Visits Total
-            html.Th('Visits'),
-            html.Th('Visitors'),
-            # Visits Last Week
-            html.Th('Visits'),
-            html.Th('Visitors'),
-        ])
-    ])
+def create_table(organization: Organization):
+    # the rows of the selected language are set in the browser, from the organization store, and paged by the table -
+    # all the rows of the organization are sent, the green tables are not paged on the server;
+    # the wrapper keeps the downloads_table id, as the table itself has a pattern-matching id
+    return html.Div(dash_table.DataTable(
+        id={'type': 'table', 'index': organization.name},
+        columns=TABLE_COLUMNS,
+        merge_duplicate_headers=True,
+        page_action='native',
+        page_size=REPORT_TABLE_PAGE_SIZE,
+        sort_action='native',
+        filter_action='native',
+        style_table={'width': '98%'},
+        style_header={'fontWeight': 'bold', 'textAlign': 'center'},
+        style_cell={'textAlign': 'right', 'backgroundColor': report_type.repo_color},
+        style_cell_conditional=[
+            {'if': {'column_id': 'package_name'}, 'textAlign': 'left'},
+            {'if': {'column_id': 'site_score'}, 'width': '100px'},
+        ],
+    ), id='downloads_table')
 
-    table_header = [header_row]
-    table_rows = []
-    packages: list[GithubPackage] = [item for item in fetcher.packages
-                                     if item.package_site == section.repo_name and (language == 'All' or language == item.package_language)]  # type: ignore
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    for package in packages:
-        package_statistics = package.create_summary_statistics_from_daily_downloads(fetcher.end_date)
-        row = [
-            html.Td(package.package_name),
-            html.Td(package_statistics['downloads_total'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(package_statistics['downloaders_total'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(package_statistics['downloads_last_week'], style={'textAlign': 'right'}),
-            html.Td(package_statistics['downloaders_last_week'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(int(package_statistics['avg_daily_downloads']), style={'textAlign': 'right'}),
-            html.Td(package_statistics['visits_total'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(package_statistics['visitors_total'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(package_statistics['visits_last_week'], style={'textAlign': 'right'}),
-            html.Td(package_statistics['visitors_last_week'], style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(int(package_statistics['avg_daily_visits']), style={'textAlign': 'right'}),
-
-            html.Td(int(package.main_page_statistics['forks_count']), style={'textAlign': 'right'}),
-            html.Td(int(package.main_page_statistics['stargazers_count']), style={'textAlign': 'right'}),
-            html.Td(int(package.main_page_statistics['watchers_count']), style={'textAlign': 'right'}),
-            html.Td(package_statistics['site_score'], style={'textAlign': 'right', 'width': '100px'}),
-        ]
-        table_rows.append(html.Tr(row))
-
-    return html.Table(table_header + table_rows, id='downloads_table', style={
-        'width': '98%',
-        'borderCollapse': 'collapse',
-    })
 
+def create_table_record(package: Dict[str, Any]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {'package_name': package['package_name']}
+    for column in TABLE_COLUMNS[1:]:
+        value = package['statistics'][column['id']]
+        record[column['id']] = int(value) if column['id'] in TRUNCATED_STATISTICS else value
+    return record
 
-# Warning boxes for health score
-def create_package_info_box(fetcher: GithubFetcher, section: PackagesRegistry, language: str):
-    info_boxes = []
-    packages: list[GithubPackage] = [item for item in fetcher.packages
-                                     if item.package_site == section.repo_name and (language == 'All' or language == item.package_language)]  # type: ignore
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-
-    for package in packages:
-        info = package.analyse_package()
-        if info:
-            info_boxes.append(html.Div([
-                html.H3(package.package_name),
-                html.P(info),
-            ], style={'border': '1px solid #ccc', 'padding': '10px', 'margin': '10px'}))
-
-    return html.Div(info_boxes)
-
-
-def create_downloads_graph(fetcher: GithubFetcher, section: PackagesRegistry, language: str) -> Dict[str, Any]:
-    packages: List[GithubPackage] = [item for item in fetcher.packages
-                                     if item.package_site == section.repo_name and (language == 'All' or language == item.package_language)]  # type: ignore
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    downloads_dict = {p.package_name: {d.date: d.downloads for d in p.downloads} for p in packages}
-    start_date = FormattedDate.from_string(fetcher.start_date)
-    end_date = FormattedDate.from_string(fetcher.end_date)
-    date_range = [str(start_date + x) for x in range(end_date.days_from(start_date) + 1)]
-
-    traces = [
-        go.Scatter(
-            x=date_range,
-            y=[int(downloads_dict[package.package_name].get(d, 0)) for d in date_range],
-            mode='lines+markers',
-            name=package.package_name
-        )
-        for package in packages
-    ]
 
+def create_figures(aggregates: Dict[str, Any], section: PackagesRegistry, language: str) -> Dict[str, Any]:
+    rows = get_rows(aggregates, section.repo_name, language)
     return {
-        'data': traces,
-        'layout': go.Layout(
-            title='Daily Clones Evolution',
-            xaxis={'title': 'Date'},
-            yaxis={'title': 'Clones'},
-            hovermode='closest'
-        )
+        'downloads': create_time_series_figure(aggregates['dates'], rows, 'downloads', 'Daily Clones Evolution', 'Clones'),
+        'views': create_time_series_figure(aggregates['dates'], rows, 'views', 'Daily Visits Evolution', 'Visits'),
     }
 
 
-def create_visits_graph(fetcher: GithubFetcher, section: PackagesRegistry, language: str) -> Dict[str, Any]:
-    packages: list[GithubPackage] = [item for item in fetcher.packages
-                                     if item.package_site == section.repo_name and (language == 'All' or language == item.package_language)]  # type: ignore
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    views_dict = {p.package_name: {d.date: d.downloads for d in p.views} for p in packages}
-    start_date = FormattedDate.from_string(fetcher.start_date)
-    end_date = FormattedDate.from_string(fetcher.end_date)
-    date_range = [str(start_date + x) for x in range(end_date.days_from(start_date) + 1)]
-
-    traces = [
-        go.Scatter(
-            x=date_range,
-            y=[int(views_dict[package.package_name].get(d, 0)) for d in date_range],
-            mode='lines+markers',
-            name=package.package_name
-        )
-        for package in packages
-    ]
+def create_organization_data(aggregates: Dict[str, Any], section: PackagesRegistry, organization: Organization) -> Dict[str, Any]:
+    # everything the clientside callback needs to render the organization for any language; the figures are
+    # prepared for each language of the organization, as the large ones only keep the top packages
+    rows = [{
+        'language': package['language'],
+        'record': create_table_record(package),
+        'package_name': package['package_name'],
+        'warnings': package['warnings'] if organization.report_warnings else '',
+    } for package in get_rows(aggregates, section.repo_name)]
+    languages = aggregates['index'].get(section.repo_name, {ALL_LANGUAGES: []})
 
     return {
-        'data': traces,
-        'layout': go.Layout(
-            title='Daily Visits Evolution',
-            xaxis={'title': 'Date'},
-            yaxis={'title': 'Visits'},
-            hovermode='closest'
-        )
+        'title': f"{organization.name} - {section.repo_name.upper()} Repositories Downloads",
+        'rows': rows,
+        'figures': {language: create_figures(aggregates, section, language) for language in languages},
     }
 
 
 @app.callback(
-    Output('report-content', 'children'),
-    [Input('file-selector', 'value'),
-     Input('language-filter', 'value')]
+    [Output('file-selector', 'value'),
+     Output('org-selector', 'value'),
+     Output('language-filter', 'value')],
+    [Input('url', 'search')],
+    [State('file-selector', 'options')]
 )
-def update_green_report(selected_file: str, selected_language: str):
-    fetchers = {org: GithubFetcher.from_generated_file(selected_file, org.value) for org in EcosystemConfiguration}
-    repo = PackagesRegistries.GITHUB
+def select_from_url(search: Optional[str], file_options: List[Dict[str, str]]):
+    # e.g. ?file=green2024-05-31.json&organization=MULTIVERSX&language=Rust
+    return get_url_selections(search, {
+        'file': {option['label']: option['value'] for option in file_options},
+        'organization': {org.name: org.name for org in EcosystemConfiguration},
+        'language': {language: language for language in [ALL_LANGUAGES] + [lang.value.lang_name for lang in Languages]},
+    })
+
+
+@lru_cache(RENDERED_TABS_CACHE_SIZE)
+def render_green_tab(selected_tab: str, selected_file: str, data_version: Tuple[int, int],
+                     start_date: Optional[str], end_date: Optional[str]) -> html.Div:
+    # memoized per file version and dates; data_version is only part of the key
+    organization = EcosystemConfiguration[selected_tab].value
+    section = PackagesRegistries.GITHUB.value
+    aggregates = load_report_aggregates(GithubFetcher, report_type, selected_file, organization, start_date, end_date)
+    organization_id = {'index': organization.name}
     return html.Div([
-        dcc.Tabs(id="org-selector", children=[
-            dcc.Tab(label=org.value.name, id=org.value.name, style={'font-weight': 'normal'},
-                    selected_style={'font-weight': 'bold'}, children=[
-                html.H1(f"{org.value.name} - {repo.name} Repositories Downloads {'' if selected_language == 'All' else ' - ' + selected_language}"),
-                html.H2('Two Weeks Download Data Table'),
-                create_table(fetchers[org], repo.value, selected_language),
-                html.H2('Clones & Visits Trends'),
-                html.Div([
-                    dcc.Graph(
-                        id='downloads-graph',
-                        figure=create_downloads_graph(fetchers[org], repo.value, selected_language)
-                    ),
-                ], style={'display': 'inline-block', 'width': '48%'}),
-                html.Div([
-                    dcc.Graph(
-                        id='visits-graph',
-                        figure=create_visits_graph(fetchers[org], repo.value, selected_language)
-                    ),
-                ], style={'display': 'inline-block', 'width': '48%'}),
-                html.H2('Health score warnings') if org.value.report_warnings else None,
-                create_package_info_box(fetchers[org], repo.value, selected_language) if org.value.report_warnings else None,
-            ])
-            for org in EcosystemConfiguration
-        ],
-            colors={
-            "border": "white",  # Border color
-            "primary": "blue",  # Color of the selected tab
-            "background": "lightgray"  # Color of the unselected tabs
-        }),
+        dcc.Store(id={'type': 'organization-data', **organization_id}, data=create_organization_data(aggregates, section, organization)),
+        html.H1(id={'type': 'title', **organization_id}),
+        html.H2('Two Weeks Download Data Table'),
+        create_table(organization),
+        html.H2('Clones & Visits Trends'),
+        html.Div([
+            dcc.Graph(id={'type': 'downloads-graph', **organization_id}),
+        ], style={'display': 'inline-block', 'width': '48%'}),
+        html.Div([
+            dcc.Graph(id={'type': 'visits-graph', **organization_id}),
+        ], style={'display': 'inline-block', 'width': '48%'}),
+        html.H2('Health score warnings') if organization.report_warnings else None,
+        # Warning boxes for health score
+        html.Div(id={'type': 'warnings', **organization_id}),
     ])
 
 
+@app.callback(
+    Output('report-content', 'children'),
+    [Input('org-selector', 'value'),
+     Input('file-selector', 'value'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_green_report(selected_tab: str, selected_file: str, start_date: Optional[str], end_date: Optional[str]):
+    # the language filter is applied in the browser, so the organization is only sent again when the data changes
+    return render_green_tab(selected_tab, selected_file, get_data_version(selected_file), start_date, end_date)
+
+
+# renders the title, table rows, graphs and warnings of each organization for the selected language, without a server round-trip
+app.clientside_callback(
+    """
+    function(language, data, search) {
+        const html = (type, props) => ({type: type, namespace: 'dash_html_components', props: props});
+        const rows = data.rows.filter(row => language === 'All' || row.language === language);
+        const title = data.title + (language === 'All' ? ' ' : '  - ' + language);
+        const figures = data.figures[language] || data.figures['All'];
+        const warnings = rows.filter(row => row.warnings).map(row => html('Div', {
+            children: [html('H3', {children: row.package_name}), html('P', {children: row.warnings})],
+            style: {border: '1px solid #ccc', padding: '10px', margin: '10px'}
+        }));
+        // ?print=1 - the pdf export prints every row
+        const print = new URLSearchParams(search || '').get('print') === '1';
+        return [
+            title,
+            rows.map(row => row.record),
+            print ? 'none' : 'native',
+            rows.length ? figures.downloads : {data: [], layout: figures.downloads.layout},
+            rows.length ? figures.views : {data: [], layout: figures.views.layout},
+            warnings
+        ];
+    }
+    """,
+    [Output({'type': 'title', 'index': MATCH}, 'children'),
+     Output({'type': 'table', 'index': MATCH}, 'data'),
+     Output({'type': 'table', 'index': MATCH}, 'page_action'),
+     Output({'type': 'downloads-graph', 'index': MATCH}, 'figure'),
+     Output({'type': 'visits-graph', 'index': MATCH}, 'figure'),
+     Output({'type': 'warnings', 'index': MATCH}, 'children')],
+    [Input('language-filter', 'value'),
+     Input({'type': 'organization-data', 'index': MATCH}, 'data')],
+    [State('url', 'search')]
+)
+
+
 if __name__ == '__main__':
     app.run_server(debug=False, port=report_type.repo_port, host='0.0.0.0')
@@ -0,0 +1,151 @@
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+
+from multiversx_usage_analytics_tool.constants import (HTTP_GZIP,
+                                                       HTTP_POOL_SIZE,
+                                                       HTTP_POOLED_HOSTS,
+                                                       HTTP_TIMEOUT,
+                                                       NO_OF_RETRIES)
+from multiversx_usage_analytics_tool.rate_limiter import RateLimiter
+from multiversx_usage_analytics_tool.response_cache import ResponseCache
+
+
+class ConnectionStatistics:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.created: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+
+    def record_request(self, host: str, new_connection: bool) -> None:
+        with self.lock:
+            counter = self.created if new_connection else self.reused
+            counter[host] = counter.get(host, 0) + 1
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            hosts = sorted(set(self.created) | set(self.reused))
+            return {host: {'created': self.created.get(host, 0), 'reused': self.reused.get(host, 0)} for host in hosts}
+
+    def __str__(self) -> str:
+        return '\n'.join(f"{host} - connections created = {counts['created']}, reused = {counts['reused']}"
+                         for host, counts in self.to_dict().items())
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    statistics: Optional[ConnectionStatistics] = None
+
+    def _make_request(self, conn: Any, *args: Any, **kwargs: Any) -> Any:
+        # a connection without a socket is opened by this request, otherwise it is a kept-alive connection
+        if self.statistics is not None:
+            self.statistics.record_request(str(self.host), conn.sock is None)
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class CountingHTTPSConnectionPool(CountingHTTPConnectionPool, HTTPSConnectionPool):
+    pass
+
+
+class CountingPoolManager(PoolManager):
+    def __init__(self, statistics: ConnectionStatistics, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.statistics = statistics
+        self.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+    def _new_pool(self, scheme: str, host: str, port: int, request_context: Optional[Dict[str, Any]] = None) -> HTTPConnectionPool:
+        pool = super()._new_pool(scheme, host, port, request_context)
+        if isinstance(pool, CountingHTTPConnectionPool):
+            pool.statistics = self.statistics
+        return pool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    def __init__(self, statistics: ConnectionStatistics, **kwargs: Any) -> None:
+        self.statistics = statistics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any) -> None:
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = CountingPoolManager(self.statistics, num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs)
+
+
+class HttpClient:
+    def __init__(self,
+                 pool_size: int = HTTP_POOL_SIZE,
+                 timeout: Tuple[float, float] = HTTP_TIMEOUT,
+                 gzip: bool = HTTP_GZIP
+                 ) -> None:
+        self.timeout = timeout
+        self.statistics = ConnectionStatistics()
+        self.rate_limiter = RateLimiter()
+        self.cache: Optional[ResponseCache] = None
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate' if gzip else 'identity'
+        adapter = CountingHTTPAdapter(self.statistics, pool_connections=HTTP_POOLED_HOSTS, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> requests.Response:
+        ttl = self.cache.get_ttl(url) if self.cache is not None and not kwargs.get('stream') else None
+        if self.cache is None or ttl is None:
+            return self.get_with_retries(url, headers, **kwargs)
+
+        cached = self.cache.lookup(url)
+        if cached is not None and cached.is_fresh(ttl):
+            self.cache.record(hit=True)
+            return cached.to_response(url)
+
+        validation_headers = cached.get_validation_headers() if cached is not None else {}
+        response = self.get_with_retries(url, {**(headers or {}), **validation_headers}, **kwargs)
+        if cached is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            self.cache.refresh(url)
+            self.cache.record(revalidated=True)
+            return cached.to_response(url)
+
+        self.cache.record()
+        if response.status_code == HTTPStatus.OK:
+            self.cache.store(url, response)
+        return response
+
+    def get_with_retries(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> requests.Response:
+        host = urlsplit(url).hostname or ''
+        timeout = kwargs.pop('timeout', self.timeout)
+        response = requests.Response()
+        for attempt in range(NO_OF_RETRIES):
+            self.rate_limiter.acquire(host)
+            response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            self.rate_limiter.update_from_headers(host, response)
+            delay = self.rate_limiter.get_retry_delay(response, attempt)
+            if delay is None or attempt == NO_OF_RETRIES - 1:
+                break
+            response.close()
+            self.rate_limiter.backoff(host, delay)
+        return response
+
+    def enable_cache(self, file_name: str) -> None:
+        self.cache = ResponseCache(file_name)
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
@@ -1,12 +1,13 @@
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import elasticsearch.helpers
 from elastic_transport._response import ObjectApiResponse
 from elasticsearch import Elasticsearch
 
 from multiversx_usage_analytics_tool.constants import (
-    ELASTICSEARCH_CONNECTIONS_PER_NODE, ELASTICSEARCH_MAX_RETRIES,
-    REQUEST_TIMEOUT, SCAN_BATCH_SIZE, SCROLL_CONSISTENCY_TIME)
+    COMPOSITE_PAGE_SIZE, ELASTICSEARCH_CONNECTIONS_PER_NODE,
+    ELASTICSEARCH_MAX_RETRIES, REQUEST_TIMEOUT, SCAN_BATCH_SIZE,
+    SCROLL_CONSISTENCY_TIME)
 from multiversx_usage_analytics_tool.utils import FormattedDate
 
 
@@ -23,14 +24,6 @@ class Indexer:
             basic_auth=basic_auth
         )
 
-    def count_records(self,
-                      index_name: str,
-                      start_date: Optional[FormattedDate],
-                      end_date: Optional[FormattedDate]
-                      ) -> int:
-        query = self._get_query_object(start_date, end_date)
-        return self.elastic_search_client.count(index=index_name, query=query["query"])["count"]
-
     def get_records(
             self,
             index_name: str,
@@ -54,21 +47,34 @@ class Indexer:
 
         return records
 
-    def get_aggregate_records(
+    def get_composite_aggregate_records(
             self,
             index_name: str,
             aggregate_key: str = 'user_agent',
             start_timestamp: Optional[FormattedDate] = None,
             end_timestamp: Optional[FormattedDate] = None,
-    ) -> ObjectApiResponse[Any]:
-        body = self._get_aggregate_query_object(aggregate_key, start_timestamp, end_timestamp)
-
-        records = self.elastic_search_client.search(
-            index=index_name,
-            body=body,
-        )
-
-        return records
+            page_size: int = COMPOSITE_PAGE_SIZE,
+            aggregate_keys: Optional[List[str]] = None,
+            runtime_mappings: Optional[Dict[str, Any]] = None
+    ) -> Iterator[ObjectApiResponse[Any]]:
+        # yields one response per page of buckets, so the number of distinct keys is not limited by a single response
+        # aggregate_keys (default [aggregate_key]) may also reference fields computed by the cluster through runtime_mappings
+        keys = aggregate_keys if aggregate_keys else [aggregate_key]
+        after_key: Optional[Dict[str, Any]] = None
+        while True:
+            body = self._get_composite_aggregate_query_object(keys, start_timestamp, end_timestamp, page_size, after_key)
+            if runtime_mappings:
+                body['runtime_mappings'] = runtime_mappings
+            records = self.elastic_search_client.search(
+                index=index_name,
+                body=body,
+            )
+            yield records
+
+            composite = records.get('aggregations', {}).get('user_agents', {})
+            after_key = composite.get('after_key')
+            if after_key is None or len(composite.get('buckets', [])) < page_size:
+                break
 
     def _get_query_object(
         self,
@@ -116,20 +122,28 @@ class Indexer:
 
         return query
 
-    def _get_aggregate_query_object(
+    def _get_composite_aggregate_query_object(
         self,
-        key: str,
+        keys: List[str],
         start_timestamp: Optional[FormattedDate],
-        end_timestamp: Optional[FormattedDate]
+        end_timestamp: Optional[FormattedDate],
+        page_size: int,
+        after_key: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         query = self._get_query_object(start_timestamp, end_timestamp)
 
+        composite: Dict[str, Any] = {
+            "size": page_size,
+            "sources": [
+                {key: {"terms": {"field": key}}} for key in keys
+            ]
+        }
+        if after_key is not None:
+            composite["after"] = after_key
+
         aggregate = {
             "user_agents": {
-                "terms": {
-                    "field": key,
-                    "size": SCAN_BATCH_SIZE,
-                },
+                "composite": composite,
                 "aggs": {
                     "docs_per_day": {
                         "date_histogram": {
@@ -146,6 +160,8 @@ class Indexer:
         body = {
             **query,
             "size": 0,
+            # the total is only needed once, with the first page
+            "track_total_hits": after_key is None,
             "timeout": SCROLL_CONSISTENCY_TIME,
         }
 
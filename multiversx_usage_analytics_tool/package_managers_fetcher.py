@@ -1,24 +1,51 @@
+import json
+import re
+import threading
 import time
 from http import HTTPStatus
-from typing import Any, Dict, List, cast
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, cast
 
-import requests
 from bs4 import BeautifulSoup, Tag
-from fetcher import DailyActivity, Fetcher, Package, Score
-from tqdm import tqdm
-
-from multiversx_usage_analytics_tool.constants import (DAYS_IN_MONTHLY_REPORT,
-                                                       DEFAULT_DATE,
-                                                       NO_OF_RETRIES,
-                                                       NPM_PAGE_SIZE,
-                                                       SECONDS_BEFORE_RETRY)
+
+from multiversx_usage_analytics_tool.constants import (
+    CRATES_FETCH_WORKERS, DAYS_IN_MONTHLY_REPORT, DEFAULT_DATE,
+    DEFAULT_SNAPSHOT_FORMAT, NPM_FETCH_WORKERS, NPM_PAGE_SIZE,
+    PYPI_FETCH_WORKERS, PYPI_SIMPLE_INDEX_CHUNK_SIZE,
+    PYPI_SIMPLE_INDEX_FILE_NAME, PYPI_SIMPLE_INDEX_TTL)
 from multiversx_usage_analytics_tool.ecosystem import Organization
+from multiversx_usage_analytics_tool.fetcher import (ActivityAccumulator,
+                                                     DailyActivity, Fetcher,
+                                                     Package, Score)
 from multiversx_usage_analytics_tool.utils import (FormattedDate, Languages,
                                                    PackagesRegistries, Reports,
                                                    get_environment_var)
 
+PYPI_SIMPLE_INDEX_URL = 'https://pypi.org/simple/'
+PYPI_PROJECT_NAME_PATTERN = re.compile(rb'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+# longest tail of a chunk that can hold an incomplete project name token
+MAX_JSON_TOKEN_LENGTH = 1024
+
+# the local copy of the pypi index is shared by all the fetchers of a gathering
+pypi_simple_index_lock = threading.Lock()
+
+
+def iter_json_string_values(chunks: Iterable[bytes], pattern: re.Pattern[bytes], contains: bytes = b'') -> Iterator[str]:
+    # incremental scan of a json byte stream, memory is bounded by the chunk size
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        last_end = 0
+        for match in pattern.finditer(buffer):
+            last_end = match.end()
+            if contains in match.group(1):
+                yield json.loads(b'"' + match.group(1) + b'"')
+        buffer = buffer[max(last_end, len(buffer) - MAX_JSON_TOKEN_LENGTH):]
+
 
 class PackageManagersDailyActivity(DailyActivity):
+    __slots__ = ()
+
     @staticmethod
     def from_npm_fetched_data(response: Dict[str, Any]) -> 'PackageManagersDailyActivity':
         result = PackageManagersDailyActivity()
@@ -56,8 +83,11 @@ class PackageManagersPackage(Package):
                               if value < 0 or value == 0 and "present" in key)
         return negatives
 
-    def create_summary_statistics_from_daily_downloads(self, end_date: str, report_duration: int = DAYS_IN_MONTHLY_REPORT) -> Dict[str, Any]:
-        summary = super().create_summary_statistics_from_daily_downloads(end_date, report_duration)
+    def get_warnings(self) -> str:
+        return self.analyse_libraries_io_score()
+
+    def get_summary_details(self) -> Dict[str, Any]:
+        summary = super().get_summary_details()
         summary['libraries_io_score'] = sum(value for value in self.libraries_io_score.values())
         summary['libraries_io_negatives'] = self.analyse_libraries_io_score(),
         return summary
@@ -78,24 +108,11 @@ class PackageManagersPackage(Package):
 
     @staticmethod
     def from_crates_fetched_data(package: str, lang: str, response: Dict[str, Any]) -> 'PackageManagersPackage':
-        def add_or_update_downloads(my_list: List[PackageManagersDailyActivity], elem: PackageManagersDailyActivity):
-            if elem.date in [item.date for item in my_list]:
-                existing_item = next(item for item in my_list if item.date == elem.date)
-                existing_item.downloads += elem.downloads
-            else:
-                my_list.append(elem)
-
         result = PackageManagersPackage()
-        raw_downloads = response.get('version_downloads', [])
-
-        for elem in raw_downloads:
-            new_download_data = PackageManagersDailyActivity.from_crates_fetched_data(elem)
-            add_or_update_downloads(result.downloads, new_download_data)  # type: ignore
-        raw_downloads = response.get('meta', {}).get('extra_downloads', [])
-
-        for elem in raw_downloads:
-            new_download_data = PackageManagersDailyActivity.from_crates_fetched_data(elem)
-            add_or_update_downloads(result.downloads, new_download_data)  # type: ignore
+        # one row per (version, date) - summed up by date
+        raw_downloads = response.get('version_downloads', []) + response.get('meta', {}).get('extra_downloads', [])
+        accumulator = ActivityAccumulator(PackageManagersDailyActivity.from_crates_fetched_data(elem) for elem in raw_downloads)
+        result.downloads = accumulator.to_list()
 
         result.package_language = lang
         result.package_name = package
@@ -129,20 +146,8 @@ class PackageManagersFetcher(Fetcher):
     def write_report(self, repo_name: str = 'rep'):
         return super().write_report(repo_name)
 
-    def write_json(self, repo_type=Reports.BLUE.value.repo_name):
-        super().write_json(repo_type)
-
-    def get_request(self, url: str) -> requests.Response:
-        retries = NO_OF_RETRIES
-        response = requests.Response()
-        while retries > 0:
-            response = requests.get(url)
-            if response.status_code not in [HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.BAD_GATEWAY]:
-                break
-            else:
-                retries = retries - 1
-                time.sleep(SECONDS_BEFORE_RETRY)
-        return response
+    def write_json(self, repo_type=Reports.BLUE.value.repo_name, snapshot_format: str = DEFAULT_SNAPSHOT_FORMAT):
+        super().write_json(repo_type, snapshot_format)
 
     def fetch_libraries_io_score(self, package_name: str, site: str) -> Dict[str, Any]:
         libraries_io_api_key = get_environment_var('LIBRARIES_IO_API_KEY')
@@ -178,7 +183,7 @@ class PackageManagersFetcher(Fetcher):
         return scores_dict
 
     def fetch_npm_downloads(self, package_name: str) -> Dict[str, Any]:
-        url = f'https://api.npmjs.org/downloads/range/{self.start_date}:{self.end_date}/{package_name}'
+        url = f'https://api.npmjs.org/downloads/range/{self.fetch_start_date}:{self.end_date}/{package_name}'
         response = self.get_request(url)
         if 'not found' in response.text:
             return {}
@@ -206,29 +211,63 @@ class PackageManagersFetcher(Fetcher):
         response = self.get_request(url)
         response.raise_for_status()
         data = response.json()
-        data['version_downloads'] = [entry for entry in data['version_downloads'] if self.start_date <= entry['date'] <= self.end_date]
-        data['meta']['extra_downloads'] = [entry for entry in data['meta']['extra_downloads'] if self.start_date <= entry['date'] <= self.end_date]
+        data['version_downloads'] = [entry for entry in data['version_downloads'] if self.fetch_start_date <= entry['date'] <= self.end_date]
+        data['meta']['extra_downloads'] = [entry for entry in data['meta']['extra_downloads'] if self.fetch_start_date <= entry['date'] <= self.end_date]
         return data
 
     def get_pypi_package_names(self) -> List[str]:
-        package_names = []
         pattern = self.organization.search_includes[PackagesRegistries.PYPI.value.repo_name]
-        response = requests.get('https://pypi.org/simple/', headers={"Accept": "application/vnd.pypi.simple.v1+json"})
-        response.raise_for_status()
-        package_info = response.json().get('projects', [])
+        with pypi_simple_index_lock:
+            candidates = list(iter_json_string_values(self.read_pypi_simple_index(), PYPI_PROJECT_NAME_PATTERN, pattern.encode()))
 
-        for package in [item for item in package_info if pattern in item.get('name', '')]:
-            package_name = package.get('name', '')
-            response = requests.get(f"https://pypi.org/pypi/{package_name}/json")
-            if response.status_code == HTTPStatus.NOT_FOUND:
-                continue
-            response.raise_for_status()
-            urls = response.json().get('info', {}).get('project_urls', {})
+        verified = self.fetch_concurrently(self.verify_pypi_package, candidates, PYPI_FETCH_WORKERS)
+        return [package_name for package_name in verified if package_name]
 
-            if urls and self.organization.get_search_filter(PackagesRegistries.PYPI.value, urls):
-                package_names.append(package_name)
+    def verify_pypi_package(self, package_name: str) -> Optional[str]:
+        response = self.get_request(f"https://pypi.org/pypi/{package_name}/json")
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            return None
+        response.raise_for_status()
+        urls = response.json().get('info', {}).get('project_urls', {})
+        return package_name if urls and self.organization.get_search_filter(PackagesRegistries.PYPI.value, urls) else None
+
+    def read_pypi_simple_index(self) -> Iterator[bytes]:
+        # yields the index as it is downloaded (and saved locally), or from the local copy if it is still valid
+        index_file = Path(self.rep_folder if self.rep_folder else ".") / PYPI_SIMPLE_INDEX_FILE_NAME
+        validators_file = index_file.with_suffix('.validators')
+        headers = {"Accept": "application/vnd.pypi.simple.v1+json"}
+
+        if index_file.exists() and validators_file.exists():
+            if time.time() - index_file.stat().st_mtime < PYPI_SIMPLE_INDEX_TTL:
+                yield from self.read_file_chunks(index_file)
+                return
+            headers.update(json.loads(validators_file.read_text()))
+
+        response = self.get_request(PYPI_SIMPLE_INDEX_URL, headers=headers, stream=True)
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            response.close()
+            index_file.touch()
+            yield from self.read_file_chunks(index_file)
+            return
+        response.raise_for_status()
+        if 'json' not in response.headers.get('content-type', ''):
+            response.close()
+            raise ValueError(f"Unexpected content type of the pypi simple index: {response.headers.get('content-type')}")
+
+        temp_file = index_file.with_suffix('.tmp')
+        with response, open(temp_file, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=PYPI_SIMPLE_INDEX_CHUNK_SIZE):
+                file.write(chunk)
+                yield chunk
+        temp_file.replace(index_file)
+        validators = {'If-None-Match': response.headers.get('etag'), 'If-Modified-Since': response.headers.get('last-modified')}
+        validators_file.write_text(json.dumps({key: value for key, value in validators.items() if value}))
 
-        return package_names
+    @staticmethod
+    def read_file_chunks(file_name: Path) -> Iterator[bytes]:
+        with open(file_name, 'rb') as file:
+            while chunk := file.read(PYPI_SIMPLE_INDEX_CHUNK_SIZE):
+                yield chunk
 
     def fetch_pypi_package_score(self, package_name: str) -> Dict[str, Any]:
         score_details = {}
@@ -265,54 +304,57 @@ class PackageManagersFetcher(Fetcher):
         response.raise_for_status()
         data = response.json()
         data['data'] = [entry for entry in data['data']
-                        if self.start_date <= entry['date'] <= self.end_date]
+                        if self.fetch_start_date <= entry['date'] <= self.end_date]
         return data
 
     def get_package(self, item: Dict[str, Any]) -> PackageManagersPackage:
         return PackageManagersPackage.from_generated_file(item)
 
+    def fetch_npm_package(self, package_name: str, site_score: Dict[str, Any]) -> PackageManagersPackage:
+        fetched_downloads = self.fetch_npm_downloads(package_name)
+        package_downloads = PackageManagersPackage.from_npm_fetched_data(
+            package_name, Languages.JAVASCRIPT.value.lang_name, fetched_downloads)
+        package_downloads.libraries_io_score = self.fetch_libraries_io_score(package_name, PackagesRegistries.NPM.name)
+        package_downloads.site_score = Score.from_dict(site_score)
+        return package_downloads
+
+    def fetch_crates_package(self, package_name: str) -> PackageManagersPackage:
+        fetched_downloads = self.fetch_crates_downloads(package_name)
+        package_downloads = PackageManagersPackage.from_crates_fetched_data(
+            package_name, Languages.RUST.value.lang_name, fetched_downloads)
+        package_downloads.libraries_io_score = self.fetch_libraries_io_score(package_name, PackagesRegistries.CARGO.name)
+        return package_downloads
+
+    def fetch_pypi_package(self, package_name: str) -> PackageManagersPackage:
+        fetched_downloads = self.fetch_pypi_downloads(package_name)
+        package_downloads = PackageManagersPackage.from_pypi_fetched_data(
+            package_name, Languages.PYTHON.value.lang_name, fetched_downloads)
+        package_downloads.libraries_io_score = self.fetch_libraries_io_score(package_name, PackagesRegistries.PYPI.name)
+        package_downloads.site_score = Score.from_dict(self.fetch_pypi_package_score(package_name))
+        return package_downloads
+
     @staticmethod
-    def from_package_sites(org: Organization, end_date: str) -> 'PackageManagersFetcher':
+    def from_package_sites(org: Organization, end_date: str, previous: Optional[Fetcher] = None) -> 'PackageManagersFetcher':
         result = PackageManagersFetcher()
         result.start_date = str(FormattedDate.from_string(end_date) - DAYS_IN_MONTHLY_REPORT + 1)
         result.end_date = end_date
         result.organization = org
+        result.set_previous(previous)
 
         print("fetching from npm ...")
-        packages = result.get_npm_package_names()
-
-        with tqdm(total=len(packages)) as pbar:
-            for package_name in packages.keys():
-                fetched_downloads = result.fetch_npm_downloads(package_name)
-                package_downloads = PackageManagersPackage.from_npm_fetched_data(
-                    package_name, Languages.JAVASCRIPT.value.lang_name, fetched_downloads)
-                package_downloads.libraries_io_score = result.fetch_libraries_io_score(package_name, PackagesRegistries.NPM.name)
-                package_downloads.site_score = Score.from_dict(packages[package_name])
-                result.packages.append(package_downloads)
-                pbar.update(1)
+        npm_packages = result.get_npm_package_names()
+        result.packages.extend(result.fetch_concurrently(
+            lambda package_name: result.fetch_npm_package(package_name, npm_packages[package_name]),
+            list(npm_packages.keys()), NPM_FETCH_WORKERS))
 
         print("fetching from crates ...")
-        packages = result.get_crates_package_names()
-
-        with tqdm(total=len(packages)) as pbar:
-            for package_name in packages:
-                fetched_downloads = result.fetch_crates_downloads(package_name)
-                package_downloads = PackageManagersPackage.from_crates_fetched_data(
-                    package_name, Languages.RUST.value.lang_name, fetched_downloads)
-                package_downloads.libraries_io_score = result.fetch_libraries_io_score(package_name, PackagesRegistries.CARGO.name)
-                result.packages.append(package_downloads)
-                pbar.update(1)
+        crates_packages = result.get_crates_package_names()
+        result.packages.extend(result.fetch_concurrently(result.fetch_crates_package, crates_packages, CRATES_FETCH_WORKERS))
 
         print("fetching from pypi ...")
-        packages = result.get_pypi_package_names()
-
-        with tqdm(total=len(packages)) as pbar:
-            for package_name in packages:
-                fetched_downloads = result.fetch_pypi_downloads(package_name)
-                package_downloads = PackageManagersPackage.from_pypi_fetched_data(
-                    package_name, Languages.PYTHON.value.lang_name, fetched_downloads)
-                package_downloads.libraries_io_score = result.fetch_libraries_io_score(package_name, PackagesRegistries.PYPI.name)
-                package_downloads.site_score = Score.from_dict(result.fetch_pypi_package_score(package_name))
-                result.packages.append(package_downloads)
-                pbar.update(1)
+        pypi_packages = result.get_pypi_package_names()
+        result.packages.extend(result.fetch_concurrently(result.fetch_pypi_package, pypi_packages, PYPI_FETCH_WORKERS))
+
+        # packages that are no longer found on the package sites are not kept from the previous snapshot
+        result.merge_previous_packages()
         return result
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Callable, Dict, Mapping, Optional
+
+import requests
+
+from multiversx_usage_analytics_tool.constants import (
+    BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS, DEFAULT_REQUESTS_PER_SECOND,
+    HOST_REQUESTS_PER_SECOND)
+
+# a reset header above this value is an epoch timestamp, otherwise it is a number of seconds
+EPOCH_THRESHOLD = 1_000_000_000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.configured_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # takes one token (the balance may go negative) and returns the time to wait before using it
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait_time, self.paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def adapt(self, remaining: int, seconds_to_reset: float) -> None:
+        # spreads the requests left in the server's window over the time until the window resets
+        with self.lock:
+            if seconds_to_reset > 0:
+                self.rate = max(min(self.configured_rate, remaining / seconds_to_reset), 1 / seconds_to_reset)
+            else:
+                self.rate = self.configured_rate
+
+
+class RateLimiter:
+    def __init__(self,
+                 rates: Mapping[str, float] = HOST_REQUESTS_PER_SECOND,
+                 default_rate: float = DEFAULT_REQUESTS_PER_SECOND,
+                 backoff_base: float = BACKOFF_BASE_SECONDS,
+                 backoff_max: float = BACKOFF_MAX_SECONDS
+                 ) -> None:
+        self.rates = rates
+        self.default_rate = default_rate
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        self.waited_seconds: Dict[str, float] = {}
+        self.retries: Dict[str, int] = {}
+
+    def get_bucket(self, host: str) -> TokenBucket:
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+            return self.buckets[host]
+
+    def acquire(self, host: str) -> None:
+        self.wait(host, self.get_bucket(host).reserve())
+
+    def wait(self, host: str, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self.lock:
+            self.waited_seconds[host] = self.waited_seconds.get(host, 0.0) + seconds
+        time.sleep(seconds)
+
+    def backoff(self, host: str, delay: float) -> None:
+        # the whole host is paused, so that the other threads do not keep hitting a throttled server
+        with self.lock:
+            self.retries[host] = self.retries.get(host, 0) + 1
+        self.get_bucket(host).pause(delay)
+        self.acquire(host)
+
+    def update_from_headers(self, host: str, response: requests.Response) -> None:
+        remaining = response.headers.get('x-ratelimit-remaining')
+        seconds_to_reset = self.get_seconds_to_reset(response)
+        if remaining is None or not remaining.isdigit() or seconds_to_reset is None:
+            return
+        self.get_bucket(host).adapt(int(remaining), seconds_to_reset)
+
+    def get_retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        # returns None if the response was not throttled
+        if not self.is_throttled(response):
+            return None
+        retry_after = self.get_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        if response.headers.get('x-ratelimit-remaining') == '0':
+            seconds_to_reset = self.get_seconds_to_reset(response)
+            if seconds_to_reset is not None:
+                return seconds_to_reset + 1
+        # exponential backoff with jitter
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def statistics_to_dict(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            hosts = sorted(set(self.waited_seconds) | set(self.retries))
+            return {host: {'waited_seconds': self.waited_seconds.get(host, 0.0), 'retries': self.retries.get(host, 0)}
+                    for host in hosts}
+
+    def __str__(self) -> str:
+        return '\n'.join(f"{host} - waited {values['waited_seconds']:.1f} s, retries = {int(values['retries'])}"
+                         for host, values in self.statistics_to_dict().items())
+
+    @staticmethod
+    def is_throttled(response: requests.Response) -> bool:
+        if response.status_code in [HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE]:
+            return True
+        # a 403 is also returned for missing access rights (e.g. github traffic pages), which must not be retried
+        if response.status_code == HTTPStatus.FORBIDDEN:
+            return any(['retry-after' in response.headers,
+                        response.headers.get('x-ratelimit-remaining') == '0',
+                        'secondary rate limit' in response.text.lower()])
+        return False
+
+    @staticmethod
+    def get_retry_after(response: requests.Response) -> Optional[float]:
+        retry_after = response.headers.get('retry-after')
+        if not retry_after:
+            return None
+        if retry_after.strip().isdigit():
+            return float(retry_after)
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def get_seconds_to_reset(response: requests.Response) -> Optional[float]:
+        reset = response.headers.get('x-ratelimit-reset')
+        try:
+            reset_value = float(reset) if reset else None
+        except ValueError:
+            return None
+        if reset_value is None:
+            return None
+        return max(reset_value - time.time(), 0.0) if reset_value > EPOCH_THRESHOLD else reset_value
@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from multiversx_usage_analytics_tool.constants import AGGREGATES_FOLDER_NAME
+from multiversx_usage_analytics_tool.fetcher import ActivitySeries, Fetcher
+from multiversx_usage_analytics_tool.report_statistics import (
+    compute_summary_statistics, get_package_key)
+from multiversx_usage_analytics_tool.snapshot import (dumps_indexed_json,
+                                                      get_snapshot_stem,
+                                                      write_snapshot_index)
+
+ALL_LANGUAGES = 'All'
+
+
+def build_report_aggregates(fetcher: Fetcher) -> Dict[str, Any]:
+    # report-ready data of one organization: table rows sorted by downloads, with their statistics, warnings and
+    # dense daily series aligned on 'dates', plus the row indexes of each (registry, language)
+    statistics = compute_summary_statistics(fetcher)
+    dates = ActivitySeries(fetcher.start_date, fetcher.get_report_duration()).get_dates()
+    packages = sorted(fetcher.packages, key=lambda pkg: pkg.no_of_downloads, reverse=True)
+
+    rows: List[Dict[str, Any]] = []
+    index: Dict[str, Dict[str, List[int]]] = {}
+    for row_index, package in enumerate(packages):
+        attributes = list(dict.fromkeys(attribute for _, attribute, _ in package.ACTIVITY_METRICS))
+        rows.append({
+            'package_site': package.package_site,
+            'package_name': package.package_name,
+            'language': package.package_language,
+            'no_of_downloads': package.no_of_downloads,
+            'statistics': statistics.get(get_package_key(package), package.get_summary_details()),
+            'warnings': package.get_warnings(),
+            'series': {attribute: ActivitySeries.from_activity(getattr(package, attribute), fetcher.start_date, fetcher.end_date).counts.tolist()
+                       for attribute in attributes},
+        })
+        section_index = index.setdefault(package.package_site, {ALL_LANGUAGES: []})
+        section_index[ALL_LANGUAGES].append(row_index)
+        section_index.setdefault(package.package_language, []).append(row_index)
+
+    return {
+        'start_date': fetcher.start_date,
+        'end_date': fetcher.end_date,
+        'dates': dates,
+        'rows': rows,
+        'index': index,
+    }
+
+
+def get_rows(aggregates: Dict[str, Any], section: Optional[str] = None, language: str = ALL_LANGUAGES) -> List[Dict[str, Any]]:
+    # rows of a registry (all of them if section is None) and language, sorted by downloads
+    rows: List[Dict[str, Any]] = aggregates.get('rows', [])
+    if section is None:
+        return rows if language == ALL_LANGUAGES else [row for row in rows if row['language'] == language]
+    return [rows[row_index] for row_index in aggregates.get('index', {}).get(section, {}).get(language, [])]
+
+
+def get_aggregates_file(snapshot_file: str) -> Path:
+    # the sidecar lives in a subfolder, so that it is not listed among the report files; it is json whatever the snapshot format
+    path = Path(snapshot_file)
+    return path.parent / AGGREGATES_FOLDER_NAME / f"{get_snapshot_stem(path)}.json"
+
+
+def write_report_aggregates(snapshot_file: str, aggregates: Dict[str, Dict[str, Any]]) -> None:
+    # aggregates are keyed by organization name, like the snapshot, and indexed so that one organization is read at a time
+    aggregates_file = get_aggregates_file(snapshot_file)
+    aggregates_file.parent.mkdir(parents=True, exist_ok=True)
+    content, entries = dumps_indexed_json(aggregates, indent=None)
+    aggregates_file.write_bytes(content)
+    write_snapshot_index(aggregates_file, entries)
@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import (Any, Callable, Dict, Hashable, Optional, Tuple, Type,
+                    TypeVar)
+
+from multiversx_usage_analytics_tool.activity_store import ActivityStore
+from multiversx_usage_analytics_tool.constants import (
+    ACTIVITY_STORE_FILE_NAME, REPORT_CACHE_MAX_BYTES)
+from multiversx_usage_analytics_tool.ecosystem import Organization
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.fetcher import ARRAY_ITEM_SIZE, Fetcher
+from multiversx_usage_analytics_tool.report_aggregates import (
+    build_report_aggregates, get_aggregates_file)
+from multiversx_usage_analytics_tool.snapshot import (read_snapshot,
+                                                      read_snapshot_part)
+from multiversx_usage_analytics_tool.utils import (FormattedDate, Report,
+                                                   get_environment_var)
+
+F = TypeVar('F', bound=Fetcher)
+V = TypeVar('V')
+
+
+class ReportCache:
+    # LRU cache of parsed report files and of the fetchers built from them, bounded by the estimated memory usage
+    def __init__(self, max_size: int = REPORT_CACHE_MAX_BYTES) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Tuple[V, int]]) -> V:
+        # create returns the value and its estimated size
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+        # built outside the lock; two threads may both build the same entry, the last one is kept
+        value, size = create()
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            self.evict()
+        return value
+
+    def evict(self) -> None:
+        # the most recent entry is always kept, even if it is larger than max_size
+        while self.size > self.max_size and len(self.entries) > 1:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.size -= size
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __str__(self) -> str:
+        return f"report cache - entries = {len(self.entries)}, size = {self.size} bytes, hits = {self.hits}, misses = {self.misses}"
+
+
+report_cache = ReportCache()
+
+_activity_store: Optional[ActivityStore] = None
+_activity_store_lock = threading.Lock()
+
+
+def get_activity_store() -> Optional[ActivityStore]:
+    # None until gather_data has created the store
+    global _activity_store
+    with _activity_store_lock:
+        if _activity_store is None:
+            rep_folder = get_environment_var('JSON_FOLDER')
+            file_name = Path(rep_folder if rep_folder else '.') / ACTIVITY_STORE_FILE_NAME
+            if file_name.exists():
+                _activity_store = ActivityStore(str(file_name))
+        return _activity_store
+
+
+def get_data_version(selected_file: str) -> Tuple[int, int]:
+    # changes whenever the snapshot file or the activity store is written
+    rep_folder = get_environment_var('JSON_FOLDER')
+    store_file = Path(rep_folder if rep_folder else '.') / ACTIVITY_STORE_FILE_NAME
+    return (os.stat(selected_file).st_mtime_ns, store_file.stat().st_mtime_ns if store_file.exists() else 0)
+
+
+def load_report_fetcher(fetcher_class: Type[F], report: Report, selected_file: str, organization: Organization,
+                        start_date: Optional[str] = None, end_date: Optional[str] = None) -> F:
+    # a complete date range is queried from the activity store, otherwise the selected snapshot is loaded
+    store = get_activity_store()
+    if store is not None and start_date and end_date:
+        # the date picker may also send the time part
+        start = str(FormattedDate.from_string(start_date[:10]))
+        end = str(FormattedDate.from_string(end_date[:10]))
+        return store.load_fetcher(fetcher_class, report.repo_name, organization, start, end)
+    return load_cached_fetcher(fetcher_class, selected_file, organization)
+
+
+def load_cached_fetcher(fetcher_class: Type[F], file_name: str, organization: Organization) -> F:
+    # every organization is built once, until the file changes on disk; indexed snapshots are read one organization
+    # at a time, the others are parsed once for all the organizations
+    file_stat = os.stat(file_name)
+    file_key = (file_name, file_stat.st_mtime_ns)
+
+    def load_json_data() -> Tuple[Dict[str, Any], int]:
+        return read_snapshot(file_name), file_stat.st_size
+
+    def create_fetcher() -> Tuple[F, int]:
+        organization_data: Optional[Dict[str, Any]] = read_snapshot_part(file_name, organization.name)
+        if organization_data is not None:
+            return fetcher_class.from_organization_data(organization_data, organization), file_stat.st_size // len(EcosystemConfiguration)
+        json_data: Dict[str, Any] = report_cache.get_or_create(('json',) + file_key, load_json_data)
+        # each organization is estimated at its share of the file
+        return fetcher_class.from_json_data(json_data, organization), file_stat.st_size // max(len(json_data), 1)
+
+    fetcher_key = ('fetcher',) + file_key + (organization.name, fetcher_class.__name__)
+    return report_cache.get_or_create(fetcher_key, create_fetcher)
+
+
+def load_report_aggregates(fetcher_class: Type[F], report: Report, selected_file: str, organization: Organization,
+                           start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+    # the aggregates written by gather_data are used if they are up to date, otherwise they are built from the data
+    if start_date and end_date and get_activity_store() is not None:
+        # kept until the next gathering, as the table pages of a date range are requested one by one
+        def create_range_aggregates() -> Tuple[Dict[str, Any], int]:
+            aggregates = build_report_aggregates(load_report_fetcher(fetcher_class, report, selected_file, organization, start_date, end_date))
+            return aggregates, ARRAY_ITEM_SIZE * len(aggregates['rows']) * max(len(aggregates['dates']), 1)
+
+        range_key = ('range aggregates', report.repo_name, organization.name, start_date, end_date) + get_data_version(selected_file)
+        return report_cache.get_or_create(range_key, create_range_aggregates)
+
+    file_stat = os.stat(selected_file)
+    file_key = (selected_file, file_stat.st_mtime_ns)
+    aggregates_file = get_aggregates_file(selected_file)
+    if aggregates_file.exists() and aggregates_file.stat().st_mtime_ns >= file_stat.st_mtime_ns:
+        aggregates_stat = aggregates_file.stat()
+
+        def load_aggregates() -> Tuple[Dict[str, Any], int]:
+            size = aggregates_stat.st_size // len(EcosystemConfiguration)
+            aggregates: Optional[Dict[str, Any]] = read_snapshot_part(str(aggregates_file), organization.name)
+            if aggregates is None:
+                # sidecar written without index
+                return read_snapshot(str(aggregates_file)).get(organization.name, {}), size
+            return aggregates, size
+
+        aggregates_key = ('aggregates', str(aggregates_file), aggregates_stat.st_mtime_ns, organization.name)
+        organization_aggregates: Dict[str, Any] = report_cache.get_or_create(aggregates_key, load_aggregates)
+        if organization_aggregates:
+            return organization_aggregates
+
+    def create_aggregates() -> Tuple[Dict[str, Any], int]:
+        # estimated at the share of one organization in the file
+        return build_report_aggregates(load_cached_fetcher(fetcher_class, selected_file, organization)), file_stat.st_size // len(EcosystemConfiguration)
+
+    return report_cache.get_or_create(('built aggregates',) + file_key + (organization.name, fetcher_class.__name__), create_aggregates)
@@ -0,0 +1,52 @@
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+import plotly.graph_objs as go
+
+from multiversx_usage_analytics_tool.constants import (
+    GRAPH_MAX_POINTS, GRAPH_TOP_PACKAGES, GRAPH_TOP_PACKAGES_MIN_POINTS,
+    GRAPH_WEBGL_MIN_POINTS)
+
+
+def downsample(dates: List[str], series: List[Sequence[int]], max_points: int) -> Tuple[List[str], List[List[float]]]:
+    # consecutive days are averaged, so that the values are still daily values; each point is dated by its first day
+    step = math.ceil(len(dates) / max_points) if max_points > 0 else 1
+    if step <= 1:
+        return dates, [list(values) for values in series]
+    return dates[::step], [[sum(values[start:start + step]) / len(values[start:start + step]) for start in range(0, len(values), step)]
+                           for values in series]
+
+
+def create_time_series_figure(dates: List[str], rows: List[Dict[str, Any]], attribute: str, title: str, yaxis_title: str,
+                              top_packages: int = GRAPH_TOP_PACKAGES, min_downloads: int = -1, max_points: int = GRAPH_MAX_POINTS,
+                              top_packages_min_points: int = GRAPH_TOP_PACKAGES_MIN_POINTS) -> Dict[str, Any]:
+    # one trace for each package with more than min_downloads, the other packages summed in one 'Others' trace;
+    # figures with top_packages_min_points or more keep only the top packages by no_of_downloads (as in the tables)
+    # and WebGL traces are used when the figure has many points
+    ranked = sorted(rows, key=lambda row: row['no_of_downloads'], reverse=True)
+    top = [row for row in ranked if row['no_of_downloads'] > min_downloads]
+    points_per_trace = min(len(dates), max_points) if max_points > 0 else len(dates)
+    if len(top) * points_per_trace >= top_packages_min_points:
+        top = top[:max(top_packages, 0)]
+    top_rows = {id(row) for row in top}
+    others = [row for row in ranked if id(row) not in top_rows]
+
+    names = [row['package_name'] for row in top]
+    series: List[Sequence[int]] = [row['series'][attribute] for row in top]
+    if others:
+        names.append(f'Others ({len(others)})')
+        series.append([sum(values) for values in zip(*(row['series'][attribute] for row in others))])
+
+    x, ys = downsample(dates, series, max_points)
+    trace_class = go.Scattergl if len(x) * len(ys) >= GRAPH_WEBGL_MIN_POINTS else go.Scatter
+    traces = [trace_class(x=x, y=y, mode='lines+markers', name=name).to_plotly_json() for name, y in zip(names, ys)]
+
+    return {
+        'data': traces,
+        'layout': go.Layout(
+            title=title,
+            xaxis={'title': 'Date'},
+            yaxis={'title': yaxis_title},
+            hovermode='closest'
+        ).to_plotly_json()
+    }
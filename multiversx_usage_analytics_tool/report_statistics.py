@@ -0,0 +1,45 @@
+from array import array
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+from multiversx_usage_analytics_tool.constants import DAYS_IN_WEEK
+from multiversx_usage_analytics_tool.fetcher import (ARRAY_ITEM_SIZE, Fetcher,
+                                                     Package)
+
+# (package_site, package_name)
+PackageKey = Tuple[str, str]
+
+
+def get_package_key(package: Package) -> PackageKey:
+    return (package.package_site, package.package_name)
+
+
+def compute_summary_statistics(fetcher: Fetcher) -> Dict[PackageKey, Dict[str, Any]]:
+    # summary statistics of all the packages of the fetcher, from one (package x metric x day) matrix over the fetcher window:
+    # the details of Package.get_summary_details, then the total, last week and daily average of each metric
+    days = max(fetcher.get_report_duration(), 1)
+    start_ordinal = date.fromisoformat(fetcher.start_date).toordinal()
+    rows: List[Tuple[Package, Tuple[str, str, bool]]] = [(package, metric) for package in fetcher.packages for metric in package.ACTIVITY_METRICS]
+    matrix = array('q', bytes(ARRAY_ITEM_SIZE * len(rows) * days))
+
+    # the same few dates repeat for all the packages, so each one is parsed once
+    day_indexes: Dict[str, int] = {}
+    for row, (package, (_, attribute, uniques)) in enumerate(rows):
+        offset = row * days
+        for item in getattr(package, attribute):
+            index = day_indexes.get(item.date)
+            if index is None:
+                index = day_indexes[item.date] = date.fromisoformat(item.date).toordinal() - start_ordinal
+            if 0 <= index < days:
+                matrix[offset + index] += item.uniques if uniques else item.downloads
+
+    last_week_start = days - min(DAYS_IN_WEEK, days)
+    result: Dict[PackageKey, Dict[str, Any]] = {}
+    for row, (package, (name, _, _)) in enumerate(rows):
+        values = matrix[row * days:(row + 1) * days]
+        total = sum(values)
+        summary = result.setdefault(get_package_key(package), package.get_summary_details())
+        summary[f"{name}_total"] = total
+        summary[f"{name}_last_week"] = sum(values[last_week_start:])
+        summary[f"avg_daily_{name}"] = total / days
+    return result
@@ -0,0 +1,87 @@
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# filter expressions sent by dash_table.DataTable (filter_action='custom'), e.g. "{package_name} scontains sdk && {downloads_total} s> 100"
+FILTER_PART = re.compile(r'^\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+(?P<value>.*)$')
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': lambda cell, value: cell == value,
+    '!=': lambda cell, value: cell != value,
+    '<': lambda cell, value: cell < value,
+    '<=': lambda cell, value: cell <= value,
+    '>': lambda cell, value: cell > value,
+    '>=': lambda cell, value: cell >= value,
+    'contains': lambda cell, value: str(value).lower() in str(cell).lower(),
+    'datestartswith': lambda cell, value: str(cell).startswith(str(value)),
+}
+# the same operators, as typed by the user; the case prefixes of the filter row (s, i) are dropped - text matching is case insensitive
+OPERATOR_ALIASES = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+# operators that match the text of the value, e.g. "contains 10" also matches "v10.2"
+TEXT_OPERATORS = {'contains', 'datestartswith'}
+
+
+def parse_filter_value(value: str, numeric: bool = True) -> Any:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        return value[1:-1]
+    if not numeric:
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def get_filter_operator(operator: str) -> Optional[str]:
+    if operator not in FILTER_OPERATORS and operator[:1] in 'si':
+        operator = operator[1:]
+    operator = OPERATOR_ALIASES.get(operator, operator)
+    return operator if operator in FILTER_OPERATORS else None
+
+
+def matches_filter(record: Dict[str, Any], column: str, compare: Callable[[Any, Any], bool], value: Any) -> bool:
+    cell = record.get(column)
+    if cell is None:
+        # empty cells only match '!='
+        return compare is FILTER_OPERATORS['!=']
+    try:
+        return compare(cell, value)
+    except TypeError:
+        # numbers compared with text
+        return compare(str(cell), str(value))
+
+
+def filter_records(records: List[Dict[str, Any]], filter_query: Optional[str]) -> List[Dict[str, Any]]:
+    # the conditions are joined with '&&'; unknown operators are ignored
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_PART.match(part.strip())
+        if not match:
+            continue
+        operator = get_filter_operator(match['operator'])
+        if operator is None:
+            continue
+        value = parse_filter_value(match['value'], numeric=operator not in TEXT_OPERATORS)
+        records = [record for record in records if matches_filter(record, match['column'], FILTER_OPERATORS[operator], value)]
+    return records
+
+
+def sort_records(records: List[Dict[str, Any]], sort_by: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    # applied from the last column to the first, so that the first column has priority; empty cells are always last
+    for item in reversed(sort_by or []):
+        column = item['column_id']
+        present = [record for record in records if record.get(column) is not None]
+        missing = [record for record in records if record.get(column) is None]
+        records = sorted(present, key=lambda record: record[column], reverse=item.get('direction') == 'desc') + missing
+    return records
+
+
+def get_table_page(records: List[Dict[str, Any]], page_current: Optional[int], page_size: Optional[int],
+                   sort_by: Optional[List[Dict[str, str]]] = None, filter_query: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    # the rows of the current page, the number of pages and the current page (the last one, if a filter left fewer pages);
+    # without a page size, all the rows are on one page
+    records = sort_records(filter_records(records, filter_query), sort_by)
+    if page_size is None:
+        return records, 1, 0
+    page_count = max(math.ceil(len(records) / page_size), 1)
+    page = min(page_current or 0, page_count - 1)
+    return records[page * page_size:(page + 1) * page_size], page_count, page
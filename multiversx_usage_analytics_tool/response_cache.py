@@ -0,0 +1,141 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from multiversx_usage_analytics_tool.constants import (HTTP_CACHE_MAX_BYTES,
+                                                       HTTP_CACHE_TTLS)
+
+# query parameters that are never part of the cache key (nor stored on disk)
+SECRET_QUERY_PARAMETERS = ['api_key']
+# the stored content is already decoded
+DROPPED_HEADERS = ['content-encoding', 'content-length', 'transfer-encoding']
+
+
+class CachedResponse:
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, stored_at: float) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: int) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def get_validation_headers(self) -> Dict[str, str]:
+        validation_headers = {}
+        headers = CaseInsensitiveDict(self.headers)
+        if 'etag' in headers:
+            validation_headers['If-None-Match'] = headers['etag']
+        if 'last-modified' in headers:
+            validation_headers['If-Modified-Since'] = headers['last-modified']
+        return validation_headers
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        return response
+
+
+class ResponseCache:
+    def __init__(self,
+                 file_name: str,
+                 max_size: int = HTTP_CACHE_MAX_BYTES,
+                 ttls: List[Tuple[str, int]] = HTTP_CACHE_TTLS
+                 ) -> None:
+        self.max_size = max_size
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER,
+                headers TEXT,
+                content BLOB,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self.connection.commit()
+
+    def get_ttl(self, url: str) -> Optional[int]:
+        # None if the url does not belong to a cached endpoint class, 0 if it must always be revalidated
+        return next((ttl for pattern, ttl in self.ttls if pattern.search(url)), None)
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        key = self.get_key(url)
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT status_code, headers, content, stored_at FROM responses WHERE url = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), key))
+            self.connection.commit()
+        status_code, headers, content, stored_at = row
+        return CachedResponse(status_code, json.loads(headers), content, stored_at)
+
+    def store(self, url: str, response: requests.Response) -> None:
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in DROPPED_HEADERS}
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.get_key(url), response.status_code, json.dumps(headers), response.content, len(response.content), now, now))
+            self.evict()
+            self.connection.commit()
+
+    def refresh(self, url: str) -> None:
+        now = time.time()
+        with self.lock:
+            self.connection.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, self.get_key(url)))
+            self.connection.commit()
+
+    def evict(self) -> None:
+        # removes the least recently used responses until the cache fits max_size
+        total_size = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        rows = self.connection.execute('SELECT url, size FROM responses ORDER BY accessed_at, rowid').fetchall()
+        for url, size in rows:
+            if total_size <= self.max_size:
+                break
+            self.connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total_size -= size
+
+    def record(self, hit: bool = False, revalidated: bool = False) -> None:
+        with self.lock:
+            if hit:
+                self.hits += 1
+            elif revalidated:
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    def __str__(self) -> str:
+        return f"responses from cache = {self.hits}, revalidated (304) = {self.revalidated}, downloaded = {self.misses}"
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        parts = urlsplit(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key not in SECRET_QUERY_PARAMETERS]
+        return urlunsplit(parts._replace(query=urlencode(query)))
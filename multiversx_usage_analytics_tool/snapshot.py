@@ -0,0 +1,242 @@
+import gzip
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from multiversx_usage_analytics_tool.constants import (
+    DEFAULT_SNAPSHOT_FORMAT, SNAPSHOT_COMPRESSION_LEVELS,
+    SNAPSHOT_INDEX_FOLDER_NAME)
+
+# optional serializers - the formats that need a missing package are not offered
+orjson: Optional[ModuleType]
+zstandard: Optional[ModuleType]
+msgpack: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# (offset, length) of a part of a snapshot file
+ByteRange = Tuple[int, int]
+
+
+def dumps_json(data: Any) -> bytes:
+    # compact json, to be compressed
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def loads_json(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps_indexed_json(data: Dict[str, Any], indent: Optional[int] = 4) -> Tuple[bytes, Dict[str, Dict[str, Any]]]:
+    # the same text as json.dumps(data, indent=indent), written piece by piece to record the byte range of each entry
+    chunks: List[str] = []
+    position = 0
+    separator = ',' if indent is not None else ', '
+
+    def append(text: str) -> ByteRange:
+        # ensure_ascii is on, so characters and bytes have the same offsets
+        nonlocal position
+        chunks.append(text)
+        position += len(text)
+        return (position - len(text), len(text))
+
+    def new_line(level: int) -> str:
+        return '\n' + ' ' * indent * level if indent is not None else ''
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    if not data:
+        return b'{}', entries
+    append('{')
+    for key_index, (key, value) in enumerate(data.items()):
+        append((separator if key_index else '') + new_line(1) + json.dumps(key) + ': ')
+        text = json.dumps(value, indent=indent).replace('\n', new_line(1)) if indent is not None else json.dumps(value)
+        entries[key] = {'range': append(text)}
+    append(new_line(0) + '}')
+    return ''.join(chunks).encode(), entries
+
+
+def dumps_indexed_members(data: Dict[str, Any], compress: Callable[[bytes], bytes]) -> Tuple[bytes, Dict[str, Dict[str, Any]]]:
+    # compact json where each entry is compressed separately; the concatenated members are a valid compressed stream
+    members: List[bytes] = []
+    entries: Dict[str, Dict[str, Any]] = {}
+    position = 0
+    for key_index, (key, value) in enumerate(data.items()):
+        members.append(compress((',' if key_index else '{').encode() + dumps_json(key) + b':'))
+        position += len(members[-1])
+        members.append(compress(dumps_json(value)))
+        entries[key] = {'range': (position, len(members[-1]))}
+        position += len(members[-1])
+    members.append(compress(b'}' if data else b'{}'))
+    return b''.join(members), entries
+
+
+def dumps_indexed_msgpack(data: Dict[str, Any]) -> Tuple[bytes, Dict[str, Dict[str, Any]]]:
+    # a map written key by key, so that each value can be unpacked on its own
+    assert msgpack is not None
+    parts: List[bytes] = [msgpack.Packer().pack_map_header(len(data))]
+    entries: Dict[str, Dict[str, Any]] = {}
+    position = len(parts[0])
+    for key, value in data.items():
+        parts.append(msgpack.packb(key))
+        position += len(parts[-1])
+        parts.append(msgpack.packb(value))
+        entries[key] = {'range': (position, len(parts[-1]))}
+        position += len(parts[-1])
+    return b''.join(parts), entries
+
+
+def dumps_zstd(data: Any) -> bytes:
+    assert zstandard is not None
+    return zstandard.ZstdCompressor(level=SNAPSHOT_COMPRESSION_LEVELS['json.zst']).compress(dumps_json(data))
+
+
+def loads_zstd(content: bytes) -> Any:
+    assert zstandard is not None
+    return loads_json(zstandard.ZstdDecompressor().decompress(content))
+
+
+def dumps_msgpack(data: Any) -> bytes:
+    assert msgpack is not None
+    return msgpack.packb(data)
+
+
+def loads_msgpack(content: bytes) -> Any:
+    assert msgpack is not None
+    return msgpack.unpackb(content)
+
+
+@dataclass
+class SnapshotFormat:
+    format_name: str
+    suffix: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+    available: bool = True
+    # content and byte ranges of the entries of a dict; None if the format can not be read by parts
+    dumps_indexed: Optional[Callable[[Dict[str, Any]], Tuple[bytes, Dict[str, Dict[str, Any]]]]] = None
+
+
+SNAPSHOT_FORMATS: Dict[str, SnapshotFormat] = {
+    # indented text, readable and compatible with the files generated so far
+    'json': SnapshotFormat('json', '.json',
+                           lambda data: json.dumps(data, indent=4).encode(),
+                           loads_json,
+                           dumps_indexed=dumps_indexed_json),
+    'json.gz': SnapshotFormat('json.gz', '.json.gz',
+                              lambda data: gzip.compress(dumps_json(data), SNAPSHOT_COMPRESSION_LEVELS['json.gz']),
+                              lambda content: loads_json(gzip.decompress(content)),
+                              dumps_indexed=lambda data: dumps_indexed_members(data, lambda content: gzip.compress(content, SNAPSHOT_COMPRESSION_LEVELS['json.gz']))),
+    'json.zst': SnapshotFormat('json.zst', '.json.zst', dumps_zstd, loads_zstd, zstandard is not None),
+    'msgpack': SnapshotFormat('msgpack', '.msgpack', dumps_msgpack, loads_msgpack, msgpack is not None, dumps_indexed_msgpack),
+}
+
+
+def get_available_formats() -> List[str]:
+    return [name for name, snapshot_format in SNAPSHOT_FORMATS.items() if snapshot_format.available]
+
+
+def get_snapshot_format(file_name: str) -> SnapshotFormat:
+    # longest suffix first, so that '.json.gz' is not taken for '.gz'
+    for snapshot_format in sorted(SNAPSHOT_FORMATS.values(), key=lambda item: len(item.suffix), reverse=True):
+        if file_name.endswith(snapshot_format.suffix):
+            return snapshot_format
+    return SNAPSHOT_FORMATS['json']
+
+
+def detect_snapshot_format(file_name: str, content: bytes) -> SnapshotFormat:
+    # compressed content is recognized by its magic number, whatever the name of the file
+    if content.startswith(GZIP_MAGIC):
+        return SNAPSHOT_FORMATS['json.gz']
+    if content.startswith(ZSTD_MAGIC):
+        return SNAPSHOT_FORMATS['json.zst']
+    return get_snapshot_format(file_name)
+
+
+def read_snapshot(file_name: str) -> Any:
+    content = Path(file_name).read_bytes()
+    snapshot_format = detect_snapshot_format(file_name, content)
+    if not snapshot_format.available:
+        raise ValueError(f"{Path(file_name).name} - the {snapshot_format.format_name} format requires an optional package that is not installed")
+    return snapshot_format.loads(content)
+
+
+def write_snapshot(file_stem: Path, data: Any, format_name: str = DEFAULT_SNAPSHOT_FORMAT, indexed: bool = False) -> Path:
+    # file_stem is the file path without suffix, e.g. JSON_FOLDER/blue2024-05-31;
+    # indexed snapshots (dicts keyed by organization) also get an index, if the format can be read by parts
+    snapshot_format = SNAPSHOT_FORMATS[format_name]
+    if not snapshot_format.available:
+        raise ValueError(f"the {format_name} format requires an optional package that is not installed")
+    file_name = file_stem.with_name(file_stem.name + snapshot_format.suffix)
+    if indexed and snapshot_format.dumps_indexed is not None:
+        content, entries = snapshot_format.dumps_indexed(data)
+        file_name.write_bytes(content)
+        write_snapshot_index(file_name, entries)
+    else:
+        file_name.write_bytes(snapshot_format.dumps(data))
+    return file_name
+
+
+def get_index_file(file_name: Path) -> Path:
+    return file_name.parent / SNAPSHOT_INDEX_FOLDER_NAME / f'{file_name.name}.json'
+
+
+def write_snapshot_index(file_name: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    # written after the snapshot, with its size, so that an index left over from a previous file is never used
+    index_file = get_index_file(file_name)
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    index_file.write_text(json.dumps({'size': file_name.stat().st_size, 'entries': entries}))
+
+
+def load_snapshot_index(file_name: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    # None if the snapshot has no index or if the index is older than the snapshot
+    index_file = get_index_file(file_name)
+    if not index_file.exists() or index_file.stat().st_mtime_ns < file_name.stat().st_mtime_ns:
+        return None
+    index: Dict[str, Any] = json.loads(index_file.read_text())
+    return index['entries'] if index.get('size') == file_name.stat().st_size else None
+
+
+def read_snapshot_part(file_name: str, key: str) -> Optional[Any]:
+    # one entry of an indexed snapshot (e.g. one organization), read and parsed without the rest of the file;
+    # None if the snapshot has no up to date index
+    path = Path(file_name)
+    entries = load_snapshot_index(path)
+    if entries is None:
+        return None
+    entry = entries.get(key)
+    if entry is None:
+        return {}
+    with open(path, 'rb') as file:
+        file.seek(entry['range'][0])
+        return get_snapshot_format(path.name).loads(file.read(entry['range'][1]))
+
+
+def get_snapshot_stem(file_name: Path) -> str:
+    # file name without the snapshot suffix, e.g. blue2024-05-31
+    return file_name.name[:-len(get_snapshot_format(file_name.name).suffix)]
+
+
+def get_snapshot_files(folder: str, prefix: str) -> List[Path]:
+    # snapshots of all the formats, most recent first
+    files = [file for file in Path(folder).glob(f'{prefix}*')
+             if file.is_file() and any(file.name.endswith(item.suffix) for item in SNAPSHOT_FORMATS.values())]
+    return sorted(files, key=lambda file: (get_snapshot_stem(file), file.name), reverse=True)
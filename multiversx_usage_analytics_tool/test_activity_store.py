@@ -0,0 +1,57 @@
+from pathlib import Path
+from typing import Any, Dict, cast
+
+import pytest
+
+from multiversx_usage_analytics_tool.activity_store import ActivityStore
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.github_fetcher import (GithubFetcher,
+                                                            GithubPackage)
+
+
+def create_organization_data(start_date: str, end_date: str, downloads: Dict[str, int], views: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        'metadata': {'organization': 'Multiversx', 'start_date': start_date, 'end_date': end_date},
+        'records': [{
+            'metadata': {'section_name': 'github', 'package_name': 'mx-sdk-py', 'language': 'Python', 'no_of_downloads': sum(downloads.values())},
+            'downloads': [{'date': date, 'downloads': count, 'uniques': 1} for date, count in downloads.items()],
+            'views': [{'date': date, 'downloads': count, 'uniques': 2} for date, count in views.items()],
+        }]
+    }
+
+
+class TestActivityStore:
+    def test_append_overlapping_snapshots(self, tmp_path: Path):
+        store = ActivityStore(str(tmp_path / 'store.sqlite'))
+        store.append('green', 'Multiversx', create_organization_data('2024-05-01', '2024-05-02', {'2024-05-01': 1, '2024-05-02': 2}, {}))
+        store.append('green', 'Multiversx', create_organization_data('2024-05-02', '2024-05-03', {'2024-05-02': 5, '2024-05-03': 3}, {'2024-05-03': 7}))
+
+        data = store.get_organization_data('green', 'Multiversx', '2024-05-01', '2024-05-03')
+        record = data['records'][0]
+        assert [(item['date'], item['downloads']) for item in record['downloads']] == [('2024-05-01', 1), ('2024-05-02', 5), ('2024-05-03', 3)]
+        assert record['metadata']['no_of_downloads'] == 9
+        assert store.get_organization_data('green', 'Other', '2024-05-01', '2024-05-03')['records'] == []
+
+    def test_load_fetcher_for_date_range(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv('JSON_FOLDER', str(tmp_path))
+        store = ActivityStore(str(tmp_path / 'store.sqlite'))
+        store.append('green', 'Multiversx', create_organization_data('2024-05-01', '2024-05-03', {'2024-05-01': 1, '2024-05-02': 2, '2024-05-03': 3}, {'2024-05-02': 4}))
+
+        organization = EcosystemConfiguration.MULTIVERSX.value
+        fetcher = store.load_fetcher(GithubFetcher, 'green', organization, '2024-05-02', '2024-05-03')
+        assert fetcher.get_report_duration() == 2
+        package = cast(GithubPackage, fetcher.packages[0])
+        assert package.no_of_downloads == 5
+        assert [item.uniques for item in package.views] == [2]
+        assert package.package_language == 'Python'
+
+    def test_packages_without_activity_in_range(self, tmp_path: Path):
+        store = ActivityStore(str(tmp_path / 'store.sqlite'))
+        store.append('green', 'Solana', create_organization_data('2024-05-01', '2024-05-02', {}, {}))
+        store.append('green', 'Multiversx', create_organization_data('2024-05-01', '2024-05-02', {'2024-05-01': 1}, {}))
+
+        for organization in ['Solana', 'Multiversx']:
+            data = store.get_organization_data('green', organization, '2024-05-10', '2024-05-12')
+            assert [(record['metadata']['package_name'], record['metadata']['no_of_downloads'], record['downloads'], record['views'])
+                    for record in data['records']] == [('mx-sdk-py', 0, [], [])]
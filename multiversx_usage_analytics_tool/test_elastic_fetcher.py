@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+
+from multiversx_usage_analytics_tool import elastic_fetcher
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.elastic_fetcher import \
+    ElasticSearchFetcher
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.utils import FormattedDate
+
+
+class FakeIndexer:
+    def __init__(self, *args: str) -> None:
+        pass
+
+    def get_composite_aggregate_records(self, index_name: str, start_timestamp: Optional[FormattedDate] = None,
+                                        end_timestamp: Optional[FormattedDate] = None) -> Iterator[Dict[str, Any]]:
+        day = str(end_timestamp)
+        yield {
+            'hits': {'total': {'value': 4}},
+            'aggregations': {'user_agents': {'after_key': {'user_agent': 'axios/1.6.7'}, 'buckets': [
+                {'key': {'user_agent': 'axios/1.6.7'}, 'doc_count': 3, 'docs_per_day': {'buckets': [{'key_as_string': day, 'doc_count': 3}]}},
+            ]}}
+        }
+        yield {
+            'aggregations': {'user_agents': {'buckets': [
+                {'key': {'user_agent': 'okhttp/3.14.2'}, 'doc_count': 1, 'docs_per_day': {'buckets': [{'key_as_string': day, 'doc_count': 1}]}},
+            ]}}
+        }
+
+
+class TestElasticSearchFetcher:
+    def test_windows_are_merged_in_order(self, monkeypatch: pytest.MonkeyPatch, factories: Factories):
+        monkeypatch.setattr(elastic_fetcher, 'Indexer', FakeIndexer)
+        monkeypatch.setenv('ELASTIC_SEARCH_LOGS_URL', 'http://localhost:9200')
+        monkeypatch.setenv('ELASTIC_SEARCH_USER', 'user')
+        monkeypatch.setenv('ELASTIC_SEARCH_PASSWORD', 'password')
+        monkeypatch.setenv('INGRESS_INDEX_NAME', 'ingress')
+
+        fetcher = factories.fetcher(ElasticSearchFetcher, '2024-05-18', '2024-05-31', organization=EcosystemConfiguration.MULTIVERSX.value)
+        data = fetcher.fetch_aggregate_data()
+        assert data['axios/1.6.7']['doc_count'] == 6
+        assert data['okhttp/3.14.2']['doc_count'] == 2
+        assert [item['key_as_string'] for item in data['axios/1.6.7']['docs_per_day']['buckets']] == ['2024-05-31', '2024-05-24']
+
+    def test_server_side_grouping(self, monkeypatch: pytest.MonkeyPatch, factories: Factories):
+        def find(user_agent: str) -> str:
+            raise AssertionError(f'{user_agent} classified on the client')
+
+        monkeypatch.setattr(elastic_fetcher.UserAgentGroups, 'find', find)
+        fetcher = factories.fetcher(ElasticSearchFetcher, '2024-05-25', '2024-05-31', organization=EcosystemConfiguration.MULTIVERSX.value)
+        fetcher.server_side_grouping = True
+        bucket = {'key': {'user_agent_group': 'Axios', 'user_agent_key': 'axios/1'}, 'doc_count': 2,
+                  'docs_per_day': {'buckets': [{'key_as_string': '2024-05-31', 'doc_count': 2}]}}
+        data: Dict[str, Any] = {}
+        fetcher.merge_buckets(data, [fetcher.get_flat_bucket(bucket)])
+
+        packages = fetcher.get_server_grouped_packages(data)
+        assert [(package.package_site, package.package_name, package.no_of_downloads) for package in packages] == [('Axios', 'axios/1', 2)]
+        mappings = fetcher.get_user_agent_runtime_mappings()
+        assert mappings['user_agent_key']['script']['source'].endswith('emit(key);')
@@ -0,0 +1,81 @@
+import pytest
+
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.fetcher import (ActivityAccumulator,
+                                                     ActivitySeries,
+                                                     DailyActivity, Fetcher,
+                                                     Package,
+                                                     PackageAccumulator)
+
+
+class TestIncrementalGathering:
+    def test_fetch_start_date(self, factories: Factories):
+        previous = factories.fetcher(Fetcher, '2024-05-01', '2024-05-30', [factories.package(Package, 'npmjs', 'a', {'2024-05-30': 1})])
+
+        fetcher = factories.fetcher(Fetcher, '2024-05-02', '2024-05-31', [])
+        fetcher.set_previous(previous)
+        assert fetcher.fetch_start_date == '2024-05-31'
+
+        # a gap between the previous snapshot and the new window - everything is fetched again
+        fetcher = factories.fetcher(Fetcher, '2024-07-02', '2024-07-31', [])
+        fetcher.set_previous(previous)
+        assert fetcher.fetch_start_date == '2024-07-02'
+        assert fetcher.previous is None
+
+    def test_merge_previous_packages(self, factories: Factories):
+        previous = factories.fetcher(Fetcher, '2024-05-01', '2024-05-03', [
+            factories.package(Package, 'npmjs', 'a', {'2024-05-01': 1, '2024-05-02': 2, '2024-05-03': 3}),
+            factories.package(Package, 'npmjs', 'b', {'2024-05-03': 5}),
+        ])
+        fetcher = factories.fetcher(Fetcher, '2024-05-02', '2024-05-04', [factories.package(Package, 'npmjs', 'a', {'2024-05-04': 4})])
+        fetcher.set_previous(previous)
+        fetcher.merge_previous_packages()
+        assert [(item.date, item.downloads) for item in fetcher.packages[0].downloads] == [('2024-05-02', 2), ('2024-05-03', 3), ('2024-05-04', 4)]
+        assert fetcher.packages[0].no_of_downloads == 9
+        assert len(fetcher.packages) == 1
+
+        fetcher = factories.fetcher(Fetcher, '2024-05-02', '2024-05-04', [factories.package(Package, 'npmjs', 'a', {'2024-05-04': 4})])
+        fetcher.set_previous(previous)
+        fetcher.merge_previous_packages(keep_missing_packages=True)
+        assert [item.package_name for item in fetcher.packages] == ['a', 'b']
+        assert fetcher.packages[1].no_of_downloads == 5
+
+
+class TestAccumulators:
+    def test_activity_by_date(self):
+        accumulator = ActivityAccumulator([DailyActivity('2024-05-02', 1), DailyActivity('2024-05-01', 2)])
+        accumulator.add_all([DailyActivity('2024-05-01', 3), DailyActivity('2024-05-03', 4)])
+        assert [(item.date, item.downloads) for item in accumulator.to_list()] == [('2024-05-02', 1), ('2024-05-01', 5), ('2024-05-03', 4)]
+
+    def test_packages_by_name(self, factories: Factories):
+        accumulator = PackageAccumulator()
+        accumulator.add('a', factories.package(Package, 'npmjs', 'a', {'2024-05-01': 1}))
+        accumulator.add('b', factories.package(Package, 'npmjs', 'b', {'2024-05-01': 2}))
+        accumulator.add('a', factories.package(Package, 'npmjs', 'a2', {'2024-05-01': 3, '2024-05-02': 4}))
+        packages = accumulator.to_list()
+        assert [(item.package_name, item.no_of_downloads) for item in packages] == [('a', 8), ('b', 2)]
+        assert [(item.date, item.downloads) for item in packages[0].downloads] == [('2024-05-01', 4), ('2024-05-02', 4)]
+
+
+class TestActivitySeries:
+    def test_from_activity(self):
+        activity = [DailyActivity('2024-05-03', 3, 1), DailyActivity('2024-05-01', 1), DailyActivity('2024-05-09', 9)]
+        series = ActivitySeries.from_activity(activity, '2024-05-01', '2024-05-04')
+        assert series.get_dates() == ['2024-05-01', '2024-05-02', '2024-05-03', '2024-05-04']
+        assert series.counts.tolist() == [1, 0, 3, 0]
+        assert series.uniques.tolist() == [0, 0, 1, 0]
+        assert ActivitySeries.from_activity(activity).get_dates()[-1] == '2024-05-09'
+        assert len(ActivitySeries.from_activity([])) == 0
+
+
+class TestFetchConcurrently:
+    def test_results_keep_the_order_of_the_items(self, factories: Factories, capsys: pytest.CaptureFixture[str]):
+        fetcher = factories.fetcher(Fetcher, '2024-05-01', '2024-05-31')
+        assert fetcher.fetch_concurrently(lambda item: item * 2, [3, 1, 2], 3) == [6, 2, 4]
+        assert '3/3' in capsys.readouterr().err
+
+    def test_progress_can_be_turned_off(self, factories: Factories, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]):
+        monkeypatch.setattr(Fetcher, 'show_progress', False)
+        fetcher = factories.fetcher(Fetcher, '2024-05-01', '2024-05-31')
+        assert fetcher.fetch_concurrently(lambda item: item * 2, [3, 1, 2], 3) == [6, 2, 4]
+        assert capsys.readouterr().err == ''
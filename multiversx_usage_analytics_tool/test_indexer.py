@@ -0,0 +1,31 @@
+from typing import Any, Dict, List
+
+from multiversx_usage_analytics_tool.indexer import Indexer
+
+
+class FakeElasticSearchClient:
+    def __init__(self, user_agents: List[str]) -> None:
+        self.user_agents = user_agents
+        self.bodies: List[Dict[str, Any]] = []
+
+    def search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.bodies.append(body)
+        composite = body['aggs']['user_agents']['composite']
+        after = composite.get('after', {}).get('user_agent', '')
+        page = [item for item in sorted(self.user_agents) if item > after][:composite['size']]
+        result: Dict[str, Any] = {'buckets': [{'key': {'user_agent': item}, 'doc_count': 1} for item in page]}
+        if page:
+            result['after_key'] = {'user_agent': page[-1]}
+        return {'aggregations': {'user_agents': result}}
+
+
+class TestIndexer:
+    def test_composite_aggregation_paging(self):
+        indexer = Indexer('http://localhost:9200')
+        client = FakeElasticSearchClient([f'agent/{index}' for index in range(7)])
+        indexer.elastic_search_client = client  # type: ignore
+
+        pages = list(indexer.get_composite_aggregate_records('ingress', page_size=3))
+        assert [len(page['aggregations']['user_agents']['buckets']) for page in pages] == [3, 3, 1]
+        assert [body['track_total_hits'] for body in client.bodies] == [True, False, False]
+        assert client.bodies[1]['aggs']['user_agents']['composite']['after'] == {'user_agent': 'agent/2'}
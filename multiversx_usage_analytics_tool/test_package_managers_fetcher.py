@@ -0,0 +1,26 @@
+import json
+
+from multiversx_usage_analytics_tool.package_managers_fetcher import (
+    PYPI_PROJECT_NAME_PATTERN, iter_json_string_values)
+
+
+class TestPypiSimpleIndexParsing:
+    index = json.dumps({
+        'meta': {'_last-serial': 1, 'api-version': '1.1'},
+        'projects': [
+            {'_last-serial': 10, 'name': 'multiversx-sdk'},
+            {'_last-serial': 11, 'name': 'requests'},
+            {'_last-serial': 12, 'name': 'multiversx-sdk-cli'},
+            {'_last-serial': 13, 'name': 'escaped-\"quote\"-multiversx-sdk'},
+        ]
+    }).encode()
+
+    def test_names_split_across_chunks(self):
+        for chunk_size in [1, 3, 7, 64, len(self.index)]:
+            chunks = [self.index[i:i + chunk_size] for i in range(0, len(self.index), chunk_size)]
+            names = list(iter_json_string_values(chunks, PYPI_PROJECT_NAME_PATTERN))
+            assert names == ['multiversx-sdk', 'requests', 'multiversx-sdk-cli', 'escaped-"quote"-multiversx-sdk']
+
+    def test_filter_while_parsing(self):
+        names = list(iter_json_string_values([self.index], PYPI_PROJECT_NAME_PATTERN, b'multiversx-sdk'))
+        assert names == ['multiversx-sdk', 'multiversx-sdk-cli', 'escaped-"quote"-multiversx-sdk']
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Dict, List, Set, Tuple
+
+import pytest
+from dash import no_update
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from multiversx_usage_analytics_tool import utils
+from multiversx_usage_analytics_tool.utils import (Report, Reports, ReportView,
+                                                   capture_report_pdfs,
+                                                   capture_view,
+                                                   get_report_url,
+                                                   get_url_selections,
+                                                   is_print_mode)
+
+
+class FakeBrowser:
+    async def close(self):
+        pass
+
+
+class SlowPage:
+    async def goto(self, url: str, timeout: int):
+        raise PlaywrightTimeoutError(f'Timeout {timeout}ms exceeded')
+
+
+class SlowContext:
+    closed = False
+
+    async def new_page(self):
+        return SlowPage()
+
+    async def close(self):
+        self.closed = True
+
+
+class SlowBrowser:
+    def __init__(self):
+        self.context = SlowContext()
+
+    async def new_context(self):
+        return self.context
+
+
+class FakePlaywright:
+    class chromium:
+        @staticmethod
+        async def launch(headless: bool):
+            return FakeBrowser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args: object):
+        pass
+
+
+class TestUrlSelections:
+    def test_known_values_are_selected(self):
+        parameters = {'organization': {'Multiversx': 'Multiversx'}, 'language': {'C/C++': 'C/C++'}}
+        assert get_url_selections('?language=C%2FC%2B%2B&organization=Multiversx', parameters) == ['Multiversx', 'C/C++']
+
+    def test_missing_or_unknown_values_are_not_updated(self):
+        parameters = {'file': {'blue2024-05-31.json': '/data/blue2024-05-31.json'}, 'registry': {'NPM': 'NPM'}}
+        assert get_url_selections('?registry=unknown', parameters) == [no_update, no_update]
+        assert get_url_selections(None, parameters) == [no_update, no_update]
+
+    def test_url_values_are_mapped_to_control_values(self):
+        parameters = {'file': {'blue2024-05-31.json': '/data/blue2024-05-31.json'}}
+        assert get_url_selections('?file=blue2024-05-31.json', parameters) == ['/data/blue2024-05-31.json']
+
+    def test_print_mode(self):
+        assert is_print_mode('?file=blue2024-05-31.json&print=1')
+        assert not is_print_mode('?file=blue2024-05-31.json')
+        assert not is_print_mode(None)
+
+    def test_report_url(self):
+        url = get_report_url(Reports.GREEN.value, {'organization': 'MULTIVERSX', 'language': 'C/C++'})
+        assert url == f'http://0.0.0.0:{Reports.GREEN.value.repo_port}/?organization=MULTIVERSX&language=C%2FC%2B%2B'
+
+
+class TestCaptureReportPdfs:
+    def run_capture(self, monkeypatch: pytest.MonkeyPatch, views: List[ReportView], concurrency: int,
+                    empty: Set[str]) -> Tuple[List[str], int, List[Dict[str, str]]]:
+        running = {'now': 0, 'max': 0}
+        queries: List[Dict[str, str]] = []
+
+        async def fake_capture_view(browser: FakeBrowser, report_type: Report, view: ReportView, pdf_file: str) -> bool:
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+            queries.append(view.query)
+            # the views finish in reverse order
+            await asyncio.sleep(0.01 * (len(views) - int(view.query['index'])))
+            running['now'] -= 1
+            return view.query['index'] not in empty
+
+        monkeypatch.setattr(utils, 'async_playwright', FakePlaywright)
+        monkeypatch.setattr(utils, 'capture_view', fake_capture_view)
+        pdf_files = asyncio.run(capture_report_pdfs(Reports.BLUE.value, '/tmp', 'blue2024-05-31.json', views, concurrency))
+        return pdf_files, running['max'], queries
+
+    def test_pdfs_keep_the_order_of_the_views(self, monkeypatch: pytest.MonkeyPatch):
+        views = [ReportView({'index': str(index)}, f'view {index}') for index in range(6)]
+        pdf_files, _, queries = self.run_capture(monkeypatch, views, 6, empty={'2'})
+
+        assert pdf_files == ['blue2024-05-31.pdf'] + [f'/tmp/report_{index}.pdf' for index in [0, 1, 3, 4, 5]]
+        assert all(query['file'] == 'blue2024-05-31.json' and query['print'] == '1' for query in queries)
+
+    def test_concurrency_is_bounded(self, monkeypatch: pytest.MonkeyPatch):
+        views = [ReportView({'index': str(index)}, f'view {index}') for index in range(8)]
+        _, max_running, _ = self.run_capture(monkeypatch, views, 3, empty=set())
+
+        assert max_running == 3
+
+    def test_timed_out_view_is_not_saved(self, capsys: pytest.CaptureFixture[str]):
+        browser = SlowBrowser()
+        saved = asyncio.run(capture_view(browser, Reports.BLUE.value, ReportView({}, 'view 0'), '/tmp/report_0.pdf'))  # type: ignore
+
+        assert not saved
+        assert browser.context.closed
+        assert 'Timed out loading view 0: not saved' in capsys.readouterr().out
@@ -0,0 +1,60 @@
+import time
+from typing import Dict, Optional
+
+import requests
+
+from multiversx_usage_analytics_tool.rate_limiter import (RateLimiter,
+                                                          TokenBucket)
+
+
+def create_response(status_code: int, headers: Optional[Dict[str, str]] = None, text: str = '') -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = text.encode()
+    return response
+
+
+class TestRateLimiter:
+    def test_not_throttled(self):
+        limiter = RateLimiter()
+        assert limiter.get_retry_delay(create_response(200), 0) is None
+        assert limiter.get_retry_delay(create_response(404), 0) is None
+        # github traffic pages without push access
+        assert limiter.get_retry_delay(create_response(403, text='Must have push access to repository'), 0) is None
+
+    def test_retry_after_seconds(self):
+        limiter = RateLimiter()
+        assert limiter.get_retry_delay(create_response(429, {'Retry-After': '7'}), 0) == 7
+        assert limiter.get_retry_delay(create_response(403, {'Retry-After': '60'}), 3) == 60
+
+    def test_rate_limit_reset(self):
+        limiter = RateLimiter()
+        reset = str(int(time.time()) + 30)
+        delay = limiter.get_retry_delay(create_response(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}), 0)
+        assert delay is not None and 29 <= delay <= 31
+
+    def test_exponential_backoff_with_jitter(self):
+        limiter = RateLimiter(backoff_base=1, backoff_max=16)
+        for attempt, expected in enumerate([1, 2, 4, 8, 16, 16]):
+            delay = limiter.get_retry_delay(create_response(502), attempt)
+            assert delay is not None and expected / 2 <= delay <= expected
+
+
+class TestTokenBucket:
+    def test_reserve(self):
+        now = [0.0]
+        bucket = TokenBucket(2, clock=lambda: now[0])
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5
+        now[0] = 10.0
+        assert bucket.reserve() == 0
+
+    def test_pause_and_adapt(self):
+        now = [0.0]
+        bucket = TokenBucket(10, clock=lambda: now[0])
+        bucket.pause(5)
+        assert bucket.reserve() == 5
+        bucket.adapt(remaining=10, seconds_to_reset=100)
+        assert bucket.rate == 0.1
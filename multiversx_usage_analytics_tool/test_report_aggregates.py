@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.package_managers_fetcher import (
+    PackageManagersFetcher, PackageManagersPackage)
+from multiversx_usage_analytics_tool.report_aggregates import (
+    build_report_aggregates, get_aggregates_file, get_rows,
+    write_report_aggregates)
+from multiversx_usage_analytics_tool.report_data import (
+    load_report_aggregates, report_cache)
+from multiversx_usage_analytics_tool.utils import Reports
+
+
+class TestReportAggregates:
+    def create_fetcher(self, factories: Factories) -> PackageManagersFetcher:
+        return factories.fetcher(PackageManagersFetcher, '2024-05-29', '2024-05-31', [
+            factories.package(PackageManagersPackage, 'pypi', 'small', {'2024-05-29': 1, '2024-05-30': 0, '2024-05-31': 2}, 'Python'),
+            factories.package(PackageManagersPackage, 'npmjs', 'big', {'2024-05-29': 5, '2024-05-30': 5, '2024-05-31': 5}, 'Javascript'),
+            factories.package(PackageManagersPackage, 'npmjs', 'medium', {'2024-05-29': 0, '2024-05-30': 4, '2024-05-31': 0}, 'Python'),
+        ])
+
+    def test_rows_sorted_and_indexed(self, factories: Factories):
+        aggregates = build_report_aggregates(self.create_fetcher(factories))
+
+        assert aggregates['dates'] == ['2024-05-29', '2024-05-30', '2024-05-31']
+        assert [row['package_name'] for row in get_rows(aggregates)] == ['big', 'medium', 'small']
+        assert [row['package_name'] for row in get_rows(aggregates, 'npmjs')] == ['big', 'medium']
+        assert [row['package_name'] for row in get_rows(aggregates, 'npmjs', 'Python')] == ['medium']
+        assert [row['package_name'] for row in get_rows(aggregates, language='Python')] == ['medium', 'small']
+        assert get_rows(aggregates, 'crates') == []
+
+        big = get_rows(aggregates)[0]
+        assert big['series'] == {'downloads': [5, 5, 5]}
+        assert big['statistics']['downloads_total'] == 15
+        assert big['statistics']['avg_daily_downloads'] == 5
+
+    def test_sidecar_is_used_when_up_to_date(self, factories: Factories, tmp_path: Path):
+        organization = EcosystemConfiguration.MULTIVERSX.value
+        fetcher = self.create_fetcher(factories)
+        snapshot_file = tmp_path / 'blue2024-05-31.json'
+        snapshot_file.write_text(json.dumps({organization.name: fetcher.to_dict()}))
+        aggregates = build_report_aggregates(fetcher)
+        aggregates['rows'][0]['warnings'] = 'from sidecar'
+        write_report_aggregates(str(snapshot_file), {organization.name: aggregates})
+        report_cache.clear()
+
+        assert get_aggregates_file(str(snapshot_file)) == tmp_path / 'aggregates' / 'blue2024-05-31.json'
+        loaded = load_report_aggregates(PackageManagersFetcher, Reports.BLUE.value, str(snapshot_file), organization)
+        assert loaded['rows'][0]['warnings'] == 'from sidecar'
+
+        get_aggregates_file(str(snapshot_file)).unlink()
+        rebuilt = load_report_aggregates(PackageManagersFetcher, Reports.BLUE.value, str(snapshot_file), organization)
+        assert rebuilt['rows'][0]['warnings'] == ''
+        assert [row['package_name'] for row in rebuilt['rows']] == ['big', 'medium', 'small']
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from multiversx_usage_analytics_tool import report_data
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.package_managers_fetcher import \
+    PackageManagersFetcher
+from multiversx_usage_analytics_tool.report_data import (ReportCache,
+                                                         load_cached_fetcher,
+                                                         report_cache)
+
+
+class TestReportCache:
+    def test_lru_eviction_by_size(self):
+        cache = ReportCache(max_size=25)
+        for index in range(3):
+            cache.get_or_create(index, lambda: (index, 10))
+        cache.get_or_create(1, lambda: (None, 10))
+        cache.get_or_create(3, lambda: (3, 10))
+        assert list(cache.entries) == [1, 3]
+        assert cache.size == 20
+
+    def test_file_parsed_once_per_modification(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv('JSON_FOLDER', str(tmp_path))
+        file_name = tmp_path / 'blue2024-05-31.json'
+        organizations = [item.value for item in EcosystemConfiguration]
+        file_name.write_text(json.dumps({org.name: {'metadata': {'start_date': '2024-05-02', 'end_date': '2024-05-31'}, 'records': []}
+                                         for org in organizations}))
+        loads: List[str] = []
+        original_read_snapshot = report_data.read_snapshot
+        monkeypatch.setattr(report_data, 'read_snapshot', lambda file_name: loads.append(file_name) or original_read_snapshot(file_name))
+        report_cache.clear()
+
+        fetchers = [load_cached_fetcher(PackageManagersFetcher, str(file_name), org) for org in organizations]
+        assert load_cached_fetcher(PackageManagersFetcher, str(file_name), organizations[0]) is fetchers[0]
+        assert fetchers[1].organization == organizations[1]
+        assert len(loads) == 1
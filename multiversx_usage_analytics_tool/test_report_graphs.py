@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.report_graphs import (
+    create_time_series_figure, downsample)
+
+DATES = ['2024-05-28', '2024-05-29', '2024-05-30', '2024-05-31']
+
+
+class TestReportGraphs:
+    def test_all_packages_in_small_figures(self, factories: Factories):
+        rows = [factories.report_row('small', [0, 1, 0, 1]), factories.report_row('big', [5, 5, 5, 5]), factories.report_row('medium', [1, 2, 3, 4])]
+        figure = create_time_series_figure(DATES, rows, 'downloads', '', '', top_packages=1)
+        assert [trace['name'] for trace in figure['data']] == ['big', 'medium', 'small']
+
+    def test_top_packages_and_others(self, factories: Factories):
+        rows = [factories.report_row('small', [0, 1, 0, 1]), factories.report_row('big', [5, 5, 5, 5]), factories.report_row('medium', [1, 2, 3, 4])]
+        figure = create_time_series_figure(DATES, rows, 'downloads', 'Daily Downloads Evolution', 'Downloads', top_packages=1,
+                                           top_packages_min_points=12)
+        assert [trace['name'] for trace in figure['data']] == ['big', 'Others (2)']
+        assert list(figure['data'][1]['y']) == [1, 3, 3, 5]
+        assert figure['data'][0]['type'] == 'scatter'
+        assert figure['layout']['title']['text'] == 'Daily Downloads Evolution'
+
+    def test_min_downloads(self, factories: Factories):
+        rows = [factories.report_row('big', [500, 500, 500, 500]), factories.report_row('limit', [250, 250, 250, 250]),
+                factories.report_row('small', [1, 1, 1, 1])]
+        figure = create_time_series_figure(DATES, rows, 'downloads', '', '', min_downloads=1000)
+        assert [trace['name'] for trace in figure['data']] == ['big', 'Others (2)']
+
+    def test_ranked_by_downloads(self, factories: Factories):
+        rows = [factories.report_row('recent', [9, 9, 9, 9], no_of_downloads=36), factories.report_row('popular', [0, 0, 0, 1], no_of_downloads=500)]
+        figure = create_time_series_figure(DATES, rows, 'downloads', '', '', top_packages=1, top_packages_min_points=0)
+        assert [trace['name'] for trace in figure['data']] == ['popular', 'Others (1)']
+
+    def test_long_ranges_are_averaged(self):
+        assert downsample(DATES, [[1, 3, 5, 7]], 2) == (['2024-05-28', '2024-05-30'], [[2, 6]])
+        assert downsample(DATES, [[1, 3, 5, 7]], 4) == (DATES, [[1, 3, 5, 7]])
+        assert downsample(DATES[:3], [[1, 3, 5]], 2) == (['2024-05-28', '2024-05-30'], [[2, 5]])
+
+    def test_webgl_for_large_figures(self, factories: Factories):
+        dates = [str(date(2024, 5, 1) + timedelta(days=day)) for day in range(60)]
+        rows = [factories.report_row(f'package{index}', [index] * 60) for index in range(40)]
+        figure = create_time_series_figure(dates, rows, 'downloads', '', '')
+        assert len(figure['data']) == 40
+        assert {trace['type'] for trace in figure['data']} == {'scattergl'}
+
+    def test_top_packages_in_large_figures(self, factories: Factories):
+        dates = [str(date(2024, 5, 1) + timedelta(days=day)) for day in range(120)]
+        rows = [factories.report_row(f'package{index}', [index] * 120) for index in range(50)]
+        figure = create_time_series_figure(dates, rows, 'downloads', '', '')
+        assert len(figure['data']) == 21
+        assert figure['data'][0]['name'] == 'package49'
+        assert figure['data'][-1]['name'] == 'Others (30)'
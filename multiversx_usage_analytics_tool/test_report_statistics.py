@@ -0,0 +1,35 @@
+from typing import Dict, Tuple
+
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.github_fetcher import (
+    GithubDailyActivity, GithubFetcher, GithubPackage)
+from multiversx_usage_analytics_tool.report_statistics import \
+    compute_summary_statistics
+
+
+def create_github_package(name: str, clones: Dict[str, Tuple[int, int]], views: Dict[str, Tuple[int, int]]) -> GithubPackage:
+    package = GithubPackage()
+    package.package_site = 'github'
+    package.package_name = name
+    package.downloads = [GithubDailyActivity(date, count, uniques) for date, (count, uniques) in clones.items()]
+    package.views = [GithubDailyActivity(date, count, uniques) for date, (count, uniques) in views.items()]
+    return package
+
+
+class TestReportStatistics:
+    def test_statistics_of_all_metrics(self, factories: Factories):
+        fetcher = factories.fetcher(GithubFetcher, '2024-05-01', '2024-05-14', [
+            create_github_package('mx-sdk-py', {'2024-05-01': (3, 1), '2024-05-10': (4, 2)}, {'2024-05-09': (5, 3)}),
+            create_github_package('mx-sdk-js', {}, {'2024-05-14': (1, 1)}),
+        ])
+
+        statistics = compute_summary_statistics(fetcher)
+        metrics = ['total', 'last_week']
+        assert {f"{name}_{metric}": statistics[('github', 'mx-sdk-py')][f"{name}_{metric}"]
+                for name in ['downloads', 'downloaders', 'visits', 'visitors'] for metric in metrics} == {
+            'downloads_total': 7, 'downloads_last_week': 4, 'downloaders_total': 3, 'downloaders_last_week': 2,
+            'visits_total': 5, 'visits_last_week': 5, 'visitors_total': 3, 'visitors_last_week': 3}
+        assert statistics[('github', 'mx-sdk-py')]['avg_daily_downloads'] == 7 / 14
+        assert statistics[('github', 'mx-sdk-js')]['visits_last_week'] == 1
+        assert statistics[('github', 'mx-sdk-js')]['downloads_total'] == 0
+        assert statistics[('github', 'mx-sdk-js')]['site_score'] == '0.00'
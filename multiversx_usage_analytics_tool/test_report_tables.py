@@ -0,0 +1,41 @@
+from multiversx_usage_analytics_tool.report_tables import (filter_records,
+                                                           get_table_page,
+                                                           sort_records)
+
+RECORDS = [
+    {'package_name': '@multiversx/sdk-core', 'downloads_total': 300},
+    {'package_name': 'multiversx-sdk', 'downloads_total': 100},
+    {'package_name': 'mx-sdk-rs', 'downloads_total': 200},
+    {'package_name': 'other', 'downloads_total': None},
+]
+
+
+class TestReportTables:
+    def test_filter_query(self):
+        assert [record['package_name'] for record in filter_records(RECORDS, '{package_name} scontains SDK && {downloads_total} s> 150')] == \
+            ['@multiversx/sdk-core', 'mx-sdk-rs']
+        assert [record['package_name'] for record in filter_records(RECORDS, '{package_name} = "other"')] == ['other']
+        assert filter_records(RECORDS, '{downloads_total} unknown 5') == RECORDS
+        assert filter_records(RECORDS, '') == RECORDS
+
+    def test_contains_keeps_the_text_of_numbers(self):
+        records = [{'package_name': 'mx-sdk-10'}, {'package_name': 'mx-sdk-1'}, {'package_name': '10.0'}]
+        assert [record['package_name'] for record in filter_records(records, '{package_name} contains 10')] == ['mx-sdk-10', '10.0']
+        assert [record['downloads_total'] for record in filter_records(RECORDS, '{downloads_total} icontains 00')] == [300, 100, 200]
+        assert [record['downloads_total'] for record in filter_records(RECORDS, '{downloads_total} = 100')] == [100]
+
+    def test_sort_by_keeps_empty_cells_last(self):
+        ascending = sort_records(RECORDS, [{'column_id': 'downloads_total', 'direction': 'asc'}])
+        descending = sort_records(RECORDS, [{'column_id': 'downloads_total', 'direction': 'desc'}])
+        assert [record['downloads_total'] for record in ascending] == [100, 200, 300, None]
+        assert [record['downloads_total'] for record in descending] == [300, 200, 100, None]
+
+    def test_pages(self):
+        assert get_table_page(RECORDS, 1, 3) == (RECORDS[3:], 2, 1)
+        # a page past the end, e.g. after a filter, shows the last page
+        assert get_table_page(RECORDS, 5, 3, filter_query='{downloads_total} >= 200') == (RECORDS[:1] + RECORDS[2:3], 1, 0)
+        assert get_table_page([], 0, 3) == ([], 1, 0)
+
+    def test_all_rows_when_printed(self):
+        assert get_table_page(RECORDS, 1, None) == (RECORDS, 1, 0)
+        assert get_table_page(RECORDS, 0, None, filter_query='{downloads_total} >= 200') == (RECORDS[:1] + RECORDS[2:3], 1, 0)
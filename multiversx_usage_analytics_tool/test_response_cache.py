@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from multiversx_usage_analytics_tool.response_cache import ResponseCache
+
+
+def create_response(content: bytes, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers or {})
+    response._content = content
+    return response
+
+
+class TestResponseCache:
+    def test_ttl_by_endpoint_class(self, tmp_path: Path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+        assert cache.get_ttl('https://pypi.org/pypi/multiversx-sdk/json') == 24 * 3600
+        assert cache.get_ttl('https://api.github.com/repos/multiversx/mx-sdk-py/community/profile') == 24 * 3600
+        assert cache.get_ttl('https://api.github.com/repos/multiversx/mx-sdk-py/traffic/clones') == 0
+        assert cache.get_ttl('https://api.npmjs.org/downloads/range/2024-01-01:2024-01-30/@multiversx/sdk-core') is None
+
+    def test_secrets_are_not_part_of_the_key(self, tmp_path: Path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+        assert cache.get_key('https://libraries.io/api/NPM/a/sourcerank?api_key=secret') == 'https://libraries.io/api/NPM/a/sourcerank'
+
+    def test_store_and_revalidate(self, tmp_path: Path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+        url = 'https://pypi.org/pypi/multiversx-sdk/json'
+        cache.store(url, create_response(b'{"info": {}}', {'ETag': '"abc"', 'Content-Encoding': 'gzip'}))
+
+        cached = cache.lookup(url)
+        assert cached is not None
+        assert cached.is_fresh(60)
+        assert not cached.is_fresh(0)
+        assert cached.get_validation_headers() == {'If-None-Match': '"abc"'}
+        response = cached.to_response(url)
+        assert response.json() == {'info': {}}
+        assert 'content-encoding' not in response.headers
+
+    def test_size_bounded_eviction(self, tmp_path: Path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_size=25)
+        for index in range(3):
+            cache.store(f'https://snyk.io/advisor/python/package{index}', create_response(b'x' * 10))
+        assert cache.lookup('https://snyk.io/advisor/python/package0') is None
+        assert cache.lookup('https://snyk.io/advisor/python/package2') is not None
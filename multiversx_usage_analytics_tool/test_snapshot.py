@@ -0,0 +1,93 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from multiversx_usage_analytics_tool import fetcher
+from multiversx_usage_analytics_tool.ecosystem_configuration import \
+    EcosystemConfiguration
+from multiversx_usage_analytics_tool.factories import Factories
+from multiversx_usage_analytics_tool.package_managers_fetcher import \
+    PackageManagersFetcher
+from multiversx_usage_analytics_tool.report_aggregates import \
+    get_aggregates_file
+from multiversx_usage_analytics_tool.snapshot import (dumps_indexed_json,
+                                                      get_available_formats,
+                                                      get_snapshot_files,
+                                                      get_snapshot_stem,
+                                                      read_snapshot,
+                                                      read_snapshot_part,
+                                                      write_snapshot)
+from multiversx_usage_analytics_tool.utils import Reports
+
+SNAPSHOT = {'Multiversx': {'metadata': {'start_date': '2024-05-02', 'end_date': '2024-05-31'}, 'records': []}}
+
+
+@pytest.fixture
+def indexed_snapshot(factories: Factories) -> Dict[str, Any]:
+    return {
+        'Multiversx': {'metadata': {'start_date': '2024-05-02', 'end_date': '2024-05-31'},
+                       'records': [factories.snapshot_record('npmjs', '@multiversx/sdk-core'), factories.snapshot_record('crates', 'multiversx-sc'),
+                                   factories.snapshot_record('npmjs', 'caf\u00e9')]},
+        'Solana': {'metadata': {'start_date': '2024-05-02', 'end_date': '2024-05-31'}, 'records': []},
+        'Near': {},
+    }
+
+
+class TestSnapshot:
+    @pytest.mark.parametrize('format_name', get_available_formats())
+    def test_round_trip(self, tmp_path: Path, format_name: str):
+        file_name = write_snapshot(tmp_path / 'blue2024-05-31', SNAPSHOT, format_name)
+        assert file_name.name == f'blue2024-05-31.{format_name}'
+        assert get_snapshot_stem(file_name) == 'blue2024-05-31'
+        assert read_snapshot(str(file_name)) == SNAPSHOT
+
+    def test_default_format_is_indented_json(self, tmp_path: Path):
+        file_name = write_snapshot(tmp_path / 'blue2024-05-31', SNAPSHOT)
+        assert file_name.read_text() == json.dumps(SNAPSHOT, indent=4)
+
+    def test_compression_detected_from_content(self, tmp_path: Path):
+        file_name = tmp_path / 'blue2024-05-31.json'
+        file_name.write_bytes(gzip.compress(json.dumps(SNAPSHOT).encode()))
+        assert read_snapshot(str(file_name)) == SNAPSHOT
+
+    def test_all_formats_are_listed(self, tmp_path: Path):
+        write_snapshot(tmp_path / 'blue2024-05-24', SNAPSHOT, 'json')
+        write_snapshot(tmp_path / 'blue2024-05-31', SNAPSHOT, 'json.gz')
+        write_snapshot(tmp_path / 'green2024-05-31', SNAPSHOT, 'json')
+        (tmp_path / 'blue2024-05-31.txt').write_text('')
+
+        assert [file.name for file in get_snapshot_files(str(tmp_path), 'blue')] == ['blue2024-05-31.json.gz', 'blue2024-05-24.json']
+        assert [option['label'] for option in Reports.BLUE.value.get_report_dropdown_options(str(tmp_path))] == ['blue2024-05-31.json.gz', 'blue2024-05-24.json']
+        assert Reports.BLUE.value.get_previous_snapshot(str(tmp_path), '2024-05-31') == tmp_path / 'blue2024-05-24.json'
+        assert get_aggregates_file(str(tmp_path / 'blue2024-05-31.json.gz')) == tmp_path / 'aggregates' / 'blue2024-05-31.json'
+
+    @pytest.mark.parametrize('indent', [4, None])
+    def test_indexed_json_is_unchanged(self, indent: Optional[int], indexed_snapshot: Dict[str, Any]):
+        content, entries = dumps_indexed_json(indexed_snapshot, indent)
+        assert content == json.dumps(indexed_snapshot, indent=indent).encode()
+        offset, length = entries['Multiversx']['range']
+        assert json.loads(content[offset:offset + length]) == indexed_snapshot['Multiversx']
+
+    @pytest.mark.parametrize('format_name', [name for name in get_available_formats() if name != 'json.zst'])
+    def test_organization_parts(self, tmp_path: Path, format_name: str, indexed_snapshot: Dict[str, Any]):
+        file_name = str(write_snapshot(tmp_path / 'blue2024-05-31', indexed_snapshot, format_name, indexed=True))
+        assert read_snapshot(file_name) == indexed_snapshot
+        assert read_snapshot_part(file_name, 'Multiversx') == indexed_snapshot['Multiversx']
+        assert read_snapshot_part(file_name, 'Solana') == indexed_snapshot['Solana']
+        assert read_snapshot_part(file_name, 'Avalanche') == {}
+
+    def test_outdated_index_is_ignored(self, tmp_path: Path, indexed_snapshot: Dict[str, Any]):
+        file_name = write_snapshot(tmp_path / 'blue2024-05-31', indexed_snapshot, indexed=True)
+        write_snapshot(tmp_path / 'blue2024-05-31', SNAPSHOT)
+        assert read_snapshot_part(str(file_name), 'Multiversx') is None
+
+    def test_fetcher_reads_only_its_organization(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, indexed_snapshot: Dict[str, Any]):
+        file_name = str(write_snapshot(tmp_path / 'blue2024-05-31', indexed_snapshot, indexed=True))
+        monkeypatch.setattr(fetcher, 'read_snapshot', lambda file_name: pytest.fail('the whole snapshot was parsed'))
+
+        result = PackageManagersFetcher.from_generated_file(file_name, EcosystemConfiguration.MULTIVERSX.value)
+        assert [package.package_name for package in result.packages] == ['@multiversx/sdk-core', 'multiversx-sc', 'caf\u00e9']
+        assert result.end_date == '2024-05-31'
@@ -1,3 +1,5 @@
+import re
+
 from multiversx_usage_analytics_tool.utils import UserAgentGroups
 
 
@@ -139,3 +141,23 @@ class TestUserAgentGroups:
         key = "Dalvik/2.1.0 (Linux; U; Android 9.0; ZTE BA520 Build/MRA58K)"
         assert UserAgentGroups.get_group(key) == UserAgentGroups.UNKNOWN.value
         assert UserAgentGroups.find(key) == key
+
+    def test_painless_script(self):
+        script = UserAgentGroups.get_painless_script(emit_key=False)
+        # the groups are tested in the same order as get_group
+        positions = [script.index(f"group = '{item.value.group_name}'") for item in UserAgentGroups if item != UserAgentGroups.UNKNOWN]
+        assert positions == sorted(positions)
+        assert "/^mozilla.*\\+http|^safari.*\\+http|^opera.*\\+http/i" in script
+        assert script.endswith('emit(group);')
+
+    def test_classifier_keeps_group_priority(self):
+        def get_group_by_search(key: str):
+            # one search per prefix, in declaration order
+            return next((item.value for item in UserAgentGroups
+                         if any(re.search(prefix, key, re.IGNORECASE) for prefix in item.value.group_prefixes)), UserAgentGroups.UNKNOWN.value)
+
+        keys = ["python mx-sdk-py/0.1", "axios/1.6.7 python", "Mozilla/5.0 (iPhone; +http://example.com)", "Mozilla/5.0 (Linux; Android 10)",
+                "Opera/9.80", "xcurl/8.4.0", "curl/8.4.0", "PostmanRuntime/7.36.1", "agent@@", "", "multiline\nmozilla +http"]
+        for key in keys:
+            assert UserAgentGroups.get_group(key) == get_group_by_search(key), key
+        assert UserAgentGroups.get_group("python mx-sdk-py/0.1") == UserAgentGroups.MULTIVERSX.value
@@ -1,20 +1,29 @@
+import asyncio
 import os
 import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode
 
 import inquirer
+from dash import no_update
 from dotenv.main import load_dotenv
-from playwright.async_api import Browser, Page, Playwright
+from playwright.async_api import Browser, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 from pypdf import PdfWriter
 
 from multiversx_usage_analytics_tool.constants import (
     BLUE_REPORT_PORT, DATE_FORMAT, DAYS_IN_MONTHLY_REPORT,
     DAYS_IN_TWO_WEEKS_REPORT, DAYS_IN_WEEK, GREEN_REPORT_PORT,
-    WAIT_FOR_DROPDOWN_COMPONENT_LOAD, YELLOW_REPORT_PORT)
+    PDF_CAPTURE_CONCURRENCY, PDF_CAPTURE_TIMEOUT, USER_AGENT_CACHE_SIZE,
+    YELLOW_REPORT_PORT)
+from multiversx_usage_analytics_tool.snapshot import (get_snapshot_files,
+                                                      get_snapshot_stem)
 
 
 @dataclass
@@ -26,8 +35,13 @@ class Report:
     repo_length: int
 
     def get_report_dropdown_options(self, folder: str):
-        json_files = sorted(Path(folder).glob(f'{self.repo_name}*.json'), reverse=True)
-        return [{'label': file.name, 'value': str(file)} for file in json_files]
+        snapshot_files = get_snapshot_files(folder, self.repo_name)
+        return [{'label': file.name, 'value': str(file)} for file in snapshot_files]
+
+    def get_previous_snapshot(self, folder: str, end_date: str) -> Optional[Path]:
+        # most recent file generated for a date before end_date
+        snapshot_files = get_snapshot_files(folder, self.repo_name)
+        return next((file for file in snapshot_files if get_snapshot_stem(file)[len(self.repo_name):] < end_date), None)
 
 
 class Reports (Enum):
@@ -105,6 +119,7 @@ class UserAgentGroups(Enum):
     UNKNOWN = UserAgentGroup('Unknown', ['group-prefix'])
 
     @staticmethod
+    @lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
     def find(user_agent_name: str) -> str:
         group = UserAgentGroups.get_group(user_agent_name)
         if group in [UserAgentGroups.MULTIVERSX.value, UserAgentGroups.UNKNOWN.value]:
@@ -114,20 +129,64 @@ class UserAgentGroups(Enum):
             i = user_agent_name.index('/')
             return user_agent_name[:(i + 2)]
         elif group == UserAgentGroups.HTTPS.value:
-            url_match = re.search(r'\+(https?://[^\s;)\]]+)', user_agent_name)
+            url_match = USER_AGENT_URL_PATTERN.search(user_agent_name)
             url = url_match.group(1) if url_match else None
             return f'URL: {url}'
         return group.group_name
 
     @staticmethod
+    @lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
     def get_group(user_agent_name: str) -> UserAgentGroup:
-        group = next(
-            (group for group in [item.value for item in UserAgentGroups] if any(
-                re.search(UserAgentGroups._safe_pattern(pattern), user_agent_name, re.IGNORECASE) for pattern in group.group_prefixes
-            )
-            ), UserAgentGroups.UNKNOWN.value)
+        # the results are memoized, the classifier only runs once per distinct user agent;
+        # the name of the matched branch is the index of the group
+        match = USER_AGENT_CLASSIFIER.match(user_agent_name)
+        if match is None or match.lastgroup is None:
+            return UserAgentGroups.UNKNOWN.value
+        return USER_AGENT_GROUP_LIST[int(match.lastgroup[len('group'):])]
+
+    @staticmethod
+    def get_classifier_pattern() -> str:
+        # one branch per group, tried in declaration order, so the first group with a matching prefix wins (like a search per prefix);
+        # each branch only looks ahead for any of its prefixes and then matches an empty named group - a branch that fails
+        # scans the user agent again, so this is one compiled regex, not a single scan of the user agent
+        branches = [f"(?=[\\s\\S]*?(?:{'|'.join(UserAgentGroups._safe_pattern(prefix) for prefix in item.value.group_prefixes)}))(?P<group{index}>)"
+                    for index, item in enumerate(UserAgentGroups)]
+        return f"^(?:{'|'.join(branches)})"
 
-        return group
+    @staticmethod
+    def get_painless_script(emit_key: bool) -> str:
+        # the rules of get_group (and of find, if emit_key is set) as an Elasticsearch runtime field script
+        key_groups = [UserAgentGroups.AXIOS, UserAgentGroups.PYTHON, UserAgentGroups.APACHE, UserAgentGroups.OKHTTP, UserAgentGroups.CURL]
+        lines = [
+            "if (doc['user_agent'].size() == 0) { return; }",
+            "String agent = doc['user_agent'].value;",
+            f"String group = '{UserAgentGroups.UNKNOWN.value.group_name}';",
+        ]
+        conditions = []
+        for item in UserAgentGroups:
+            pattern = '|'.join(UserAgentGroups._safe_pattern(prefix) for prefix in item.value.group_prefixes).replace('/', '\\/')
+            conditions.append(f"if (agent =~ /{pattern}/i) {{ group = '{item.value.group_name}'; }}")
+        lines.append(' else '.join(conditions))
+        if not emit_key:
+            lines.append("emit(group);")
+            return '\n'.join(lines)
+
+        verbatim_condition = ' || '.join(f"group == '{item.value.group_name}'" for item in [UserAgentGroups.MULTIVERSX, UserAgentGroups.UNKNOWN])
+        key_condition = ' || '.join(f"group == '{item.value.group_name}'" for item in key_groups)
+        lines += [
+            "String key = group;",
+            f"if ({verbatim_condition}) {{ key = agent; }}",
+            f"else if ({key_condition}) {{",
+            "  int i = agent.indexOf('/');",
+            "  key = i < 0 ? agent : agent.substring(0, (int) Math.min(i + 2, agent.length()));",
+            "}",
+            f"else if (group == '{UserAgentGroups.HTTPS.value.group_name}') {{",
+            "  Matcher url = /\\+(https?:\\/\\/[^\\s;)\\]]+)/.matcher(agent);",
+            "  key = 'URL: ' + (url.find() ? url.group(1) : 'None');",
+            "}",
+            "emit(key);",
+        ]
+        return '\n'.join(lines)
 
     @staticmethod
     def _safe_pattern(pattern: str) -> str:
@@ -138,6 +197,12 @@ class UserAgentGroups(Enum):
             return re.escape(pattern)
 
 
+# built once at import
+USER_AGENT_GROUP_LIST = [item.value for item in UserAgentGroups]
+USER_AGENT_CLASSIFIER = re.compile(UserAgentGroups.get_classifier_pattern(), re.IGNORECASE)
+USER_AGENT_URL_PATTERN = re.compile(r'\+(https?://[^\s;)\]]+)')
+
+
 class FormattedDate:
     def __init__(self, date: datetime) -> None:
         self.date = date
@@ -216,56 +281,100 @@ def combine_pdfs(pdf_files: List[str], output_pdf: str):
     print(f"Combined PDF saved as: {output_pdf}")
 
 
-async def get_playwright_page(p: Playwright, report_type: Report) -> Tuple[Browser, Page]:
-    report_port = report_type.repo_port
-    DASH_APP_URL = f'http://0.0.0.0:{report_port}/'
-
-    browser = await p.chromium.launch(headless=True)
-    page = await browser.new_page()
-    await page.goto(DASH_APP_URL)
-
-    return (browser, page)
-
-
-async def select_report(page: Page, selected_file: str) -> str:
-    wait_for_dropdown_selection_to_load_time = WAIT_FOR_DROPDOWN_COMPONENT_LOAD
-
-    # click on selected file received from dash
-    file_selector_id = 'file-selector'
-    await page.wait_for_selector(f'#{file_selector_id}', timeout=5000)
-
-    if selected_file:
-        desired_value = selected_file.split('/')[-1]  # extract file name without path
-        await page.click(f'#{file_selector_id} .Select-control')
-        await page.wait_for_selector('.Select-menu-outer')
-
-        files = await page.evaluate('''() => {
-            let elements = document.querySelectorAll('.VirtualizedSelectOption');
-            let options_text = [];
-            elements.forEach(option => options_text.push(option.textContent));
-            return options_text;
-        }''')
-        desired_index = None
-        for index, option in enumerate(files):
-            if desired_value in option:
-                desired_index = index
-                break
-
-        if desired_index is not None:
-            option_selector = f'.Select-menu-outer .VirtualizedSelectOption:nth-child({desired_index + 1})'
-            await page.click(option_selector)
-            await page.wait_for_timeout(wait_for_dropdown_selection_to_load_time)
-
-    # Get the selected json file name
-    selected_value: str = await page.evaluate(f'''
-        document.querySelector("#{file_selector_id}").textContent;
-    ''')
+@dataclass
+class ReportView:
+    # one part of a pdf export: the report as selected by the url query, e.g. {'organization': 'Multiversx', 'registry': 'NPM'}
+    query: Dict[str, str]
+    description: str
+
+
+def get_report_url(report_type: Report, query: Dict[str, str]) -> str:
+    return f'http://0.0.0.0:{report_type.repo_port}/?{urlencode(query)}'
+
+
+def get_url_selections(search: Optional[str], parameters: Dict[str, Dict[str, Any]]) -> List[Any]:
+    # control values selected by the url query of a report, for each parameter (url value -> control value);
+    # no_update for the parameters that are missing or have an unknown value
+    query = parse_qs((search or '').lstrip('?'))
+    return [values.get(query.get(name, [''])[0], no_update) for name, values in parameters.items()]
+
+
+def is_print_mode(search: Optional[str]) -> bool:
+    # ?print=1 - the tables show all their rows, for the pdf export
+    return parse_qs((search or '').lstrip('?')).get('print') == ['1']
+
+
+def get_report_pdf_name(report_type: Report, selected_file: str) -> str:
+    # named after the rendered file - the newest one, as in the report, if no file was selected
+    if not selected_file:
+        snapshot_files = get_snapshot_files(get_environment_var('JSON_FOLDER'), report_type.repo_name)
+        selected_file = snapshot_files[0].name if snapshot_files else ''
+    return f'{get_snapshot_stem(Path(selected_file))}.pdf' if selected_file else 'combined.pdf'
+
+
+async def wait_for_report(page: Page) -> None:
+    # loaded when no dash callback is pending and the graphs are drawn, instead of waiting a fixed time
+    await page.wait_for_selector('#downloads_table', timeout=PDF_CAPTURE_TIMEOUT)
+    await page.wait_for_load_state('networkidle', timeout=PDF_CAPTURE_TIMEOUT)
+    await page.wait_for_function('''() =>
+        !document.querySelector('[data-dash-is-loading="true"]') &&
+        Array.from(document.querySelectorAll('.dash-graph')).every(graph => graph.querySelector('.main-svg'))
+    ''', timeout=PDF_CAPTURE_TIMEOUT)
+
+
+async def capture_view(browser: Browser, report_type: Report, view: ReportView, pdf_file: str) -> bool:
+    # each view is opened directly, in its own context; False if the view has no data or does not load in time
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        try:
+            await page.goto(get_report_url(report_type, view.query), timeout=PDF_CAPTURE_TIMEOUT)
+            await wait_for_report(page)
+        except PlaywrightTimeoutError:
+            print(f"Timed out loading {view.description}: not saved")
+            return False
+
+        if await is_empty_page(page):
+            print(f"Empty PDF for {view.description}: not saved")
+            return False
+
+        await page.pdf(
+            path=pdf_file,
+            format='A4',
+            landscape=True,
+            print_background=True,
+        )
+        print(f"Saved PDF for {view.description}: {pdf_file}")
+        return True
+    finally:
+        await context.close()
+
+
+async def capture_report_pdfs(report_type: Report, temp_dir: str, selected_file: str, views: List[ReportView],
+                              concurrency: int = PDF_CAPTURE_CONCURRENCY) -> List[str]:
+    # the name of the combined pdf, then the pdfs of the views with data, in the order of the views;
+    # up to concurrency views are loaded and printed at the same time
+    output = get_report_pdf_name(report_type, selected_file)
     print()
-    print(f"Target report: {selected_value}")
-    file_name = selected_value.split('.')[0]  # extract name without extension
-    output = f'{file_name}.pdf' if any(repo_type in selected_value for repo_type in ['blue', 'green', 'yellow']) else 'combined.pdf'
+    print(f"Target report: {selected_file or output}")
+    file_query = {'print': '1', **({'file': Path(selected_file).name} if selected_file else {})}
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+
+        async def capture(index: int, view: ReportView) -> Optional[str]:
+            pdf_file = os.path.join(temp_dir, f'report_{index}.pdf')
+            async with semaphore:
+                saved = await capture_view(browser, report_type, ReportView({**file_query, **view.query}, view.description), pdf_file)
+            return pdf_file if saved else None
+
+        try:
+            pdf_files = await asyncio.gather(*(capture(index, view) for index, view in enumerate(views)))
+        finally:
+            await browser.close()
 
-    return output
+    return [output] + [pdf_file for pdf_file in pdf_files if pdf_file]
 
 
 async def is_empty_page(page: Page) -> bool:
@@ -274,7 +383,8 @@ async def is_empty_page(page: Page) -> bool:
         (function() {
             var table = document.querySelector('#downloads_table');
             if (table) {
-                var rows = table.querySelectorAll('tbody tr, tr:not(thead tr)');
+                // data rows only - the header rows of the paged tables are also rendered in tbody
+                var rows = Array.from(table.querySelectorAll('tr')).filter(row => row.querySelector('td'));
                 return rows.length;
             } else {
                 return 0;
@@ -291,8 +401,8 @@ def select_target_json_file(report_type: Report) -> str:
     # display list of available json files
     directory = get_environment_var('JSON_FOLDER')
 
-    json_files = sorted(Path(directory).glob(f'{report_type.repo_name}*.json'), reverse=True)
-    file_options = [file.name for file in json_files]
+    snapshot_files = get_snapshot_files(directory, report_type.repo_name)
+    file_options = [file.name for file in snapshot_files]
 
     questions = [
         inquirer.List('selected_file',
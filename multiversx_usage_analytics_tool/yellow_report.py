@@ -1,21 +1,30 @@
-from typing import Any, Dict, cast
+from typing import Any, Dict, List, Optional
 
 import dash
-import plotly.graph_objs as go
-from dash import Input, Output, dcc, html
+from dash import Input, Output, State, dash_table, dcc, html
+from dash.dash_table.Format import Format
 
+from multiversx_usage_analytics_tool.constants import (REPORT_TABLE_PAGE_SIZE,
+                                                       YELLOW_GRAPH_MIN_USAGE)
 from multiversx_usage_analytics_tool.ecosystem_configuration import \
     EcosystemConfiguration
-from multiversx_usage_analytics_tool.elastic_fetcher import (
-    ElasticSearchFetcher, ElasticSearchPackage)
-from multiversx_usage_analytics_tool.fetcher import Package
-from multiversx_usage_analytics_tool.utils import (FormattedDate, Reports,
-                                                   get_environment_var)
+from multiversx_usage_analytics_tool.elastic_fetcher import \
+    ElasticSearchFetcher
+from multiversx_usage_analytics_tool.report_aggregates import get_rows
+from multiversx_usage_analytics_tool.report_data import load_report_aggregates
+from multiversx_usage_analytics_tool.report_graphs import \
+    create_time_series_figure
+from multiversx_usage_analytics_tool.report_tables import get_table_page
+from multiversx_usage_analytics_tool.utils import (Reports,
+                                                   get_environment_var,
+                                                   get_url_selections,
+                                                   is_print_mode)
 
 report_type = Reports.YELLOW.value
 
 
-app = dash.Dash(__name__)
+# the downloads table is created by the report callback, after the initial layout
+app = dash.Dash(__name__, suppress_callback_exceptions=True)
 
 
 def get_layout():
@@ -25,6 +34,8 @@ def get_layout():
 
     # Layout of the Dash app
     return html.Div(style={'backgroundColor': report_type.repo_color}, children=[
+        # the url query can select the view, e.g. for the pdf export
+        dcc.Location(id='url', refresh=False),
         html.Div(
             style={
                 'display': 'flex',
@@ -42,6 +53,7 @@ def get_layout():
                     clearable=False,
                     style={'width': '35%'}
                 ),
+                dcc.DatePickerRange(id='date-range', display_format='YYYY-MM-DD', clearable=True),
             ]
         ),
 
@@ -53,95 +65,96 @@ def get_layout():
 app.layout = get_layout
 
 
-def create_table(fetcher: ElasticSearchFetcher, section: str):
-    header_row = html.Thead([
-        html.Th('User', style={'width': '70%', 'textAlign': 'left'}),
-        html.Th('Count Total', style={'width': '10%', 'textAlign': 'right'}),
-        html.Th('Count last week', style={'width': '10%', 'textAlign': 'right'}),
-        html.Th('Avg count per day', style={'width': '10%', 'textAlign': 'right'}),
-    ])
-    table_header = [header_row]
-    table_rows = []
-    packages: list[ElasticSearchPackage] = [cast(ElasticSearchPackage, item) for item in fetcher.packages]
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
+TABLE_COLUMNS = [
+    {'name': 'User', 'id': 'package_name'},
+    {'name': 'Count Total', 'id': 'downloads_total', 'type': 'numeric', 'format': Format().group(True)},
+    {'name': 'Count last week', 'id': 'downloads_last_week', 'type': 'numeric', 'format': Format().group(True)},
+    {'name': 'Avg count per day', 'id': 'avg_daily_downloads', 'type': 'numeric', 'format': Format().group(True)},
+]
+TOTAL_STYLE = {'textAlign': 'right', 'fontWeight': 'bold', 'width': '10%'}
+
+
+def create_table(aggregates: Dict[str, Any], section: str):
+    # the rows are sent one page at a time by update_yellow_table; the total of all the rows is computed here
     total: Dict[str, int] = {'total_usage': 0, 'last_week_usage': 0}
-    for package in packages:
-        package_statistics = package.create_summary_statistics_from_daily_downloads(fetcher.end_date, report_type.repo_length)
-        total['total_usage'] += package_statistics['downloads_total']
-        total['last_week_usage'] += package_statistics['downloads_last_week']
-
-        row = [
-            html.Td(package.package_name),
-            html.Td(f'{package_statistics["downloads_total"]:,}', style={'textAlign': 'right', 'maxWidth': '10ch'}),
-            html.Td(f'{package_statistics["downloads_last_week"]:,}', style={'textAlign': 'right'}),
-            html.Td(f'{int(package_statistics["avg_daily_downloads"]):,}', style={'textAlign': 'right'}),
-        ]
-        table_rows.append(html.Tr(row))
-
-    row = html.Tr([
-        html.Td('Total', style={'fontWeight': 'bold'}),
-        html.Td(f'{total["total_usage"]:,}', style={'textAlign': 'right', 'maxWidth': '10ch', 'fontWeight': 'bold'}),
-        html.Td(f'{total["last_week_usage"]:,}', style={'textAlign': 'right', 'fontWeight': 'bold'}),
-        html.Td(f'{total["total_usage"] / report_type.repo_length:,.0f}', style={'textAlign': 'right', 'fontWeight': 'bold'}),
+    for package in get_rows(aggregates):
+        total['total_usage'] += package['statistics']['downloads_total']
+        total['last_week_usage'] += package['statistics']['downloads_last_week']
+
+    return html.Div([
+        dash_table.DataTable(
+            id='downloads_table',
+            columns=TABLE_COLUMNS,
+            page_action='custom',
+            page_current=0,
+            page_size=REPORT_TABLE_PAGE_SIZE,
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[],
+            filter_action='custom',
+            filter_query='',
+            style_table={'width': '98%'},
+            style_header={'fontWeight': 'bold'},
+            style_cell={'textAlign': 'right', 'width': '10%', 'backgroundColor': report_type.repo_color},
+            style_cell_conditional=[{'if': {'column_id': 'package_name'}, 'textAlign': 'left', 'width': '70%'}],
+        ),
+        html.Table(html.Tr([
+            html.Td('Total', style={'fontWeight': 'bold', 'width': '70%'}),
+            html.Td(f'{total["total_usage"]:,}', style=TOTAL_STYLE),
+            html.Td(f'{total["last_week_usage"]:,}', style=TOTAL_STYLE),
+            html.Td(f'{total["total_usage"] / max(len(aggregates["dates"]), 1):,.0f}', style=TOTAL_STYLE),
+        ]), id='downloads_total', style={'width': '98%', 'borderCollapse': 'collapse'}),
     ])
-    table_rows.append(row)
-
-    return html.Table(table_header + table_rows, id='downloads_table', style={
-        'width': '98%',
-        'borderCollapse': 'collapse',
-    })
-
-
-def create_graph(fetcher: ElasticSearchFetcher, section: str) -> Dict[str, Any]:
-    packages: list[Package] = [item for item in fetcher.packages]
-    packages.sort(key=lambda pkg: pkg.no_of_downloads, reverse=True)
-    downloads_dict = {p.package_name: {d.date: d.downloads for d in p.downloads} for p in packages}
-    start_date = FormattedDate.from_string(fetcher.start_date)
-    end_date = FormattedDate.from_string(fetcher.end_date)
-    date_range = [str(start_date + x) for x in range(end_date.days_from(start_date) + 1)]
-
-    traces = [
-        go.Scatter(
-            x=date_range,
-            y=[int(downloads_dict[package.package_name].get(d, 0)) for d in date_range],
-            mode='lines+markers',
-            name=package.package_name
-        )
-        for package in [p for p in packages if p.no_of_downloads > 1000]
-    ]
-
-    return {
-        'data': traces,
-        'layout': go.Layout(
-            title='Daily Usage Evolution',
-            xaxis={'title': 'Date'},
-            yaxis={'title': 'Usage'},
-            hovermode='closest'
-        )
-    }
+
+
+def create_table_records(aggregates: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{
+        'package_name': package['package_name'],
+        'downloads_total': package['statistics']['downloads_total'],
+        'downloads_last_week': package['statistics']['downloads_last_week'],
+        'avg_daily_downloads': int(package['statistics']['avg_daily_downloads']),
+    } for package in get_rows(aggregates)]
+
+
+def create_graph(aggregates: Dict[str, Any], section: str) -> Dict[str, Any]:
+    # the user agents with YELLOW_GRAPH_MIN_USAGE or less are only part of the 'Others' trace
+    return create_time_series_figure(aggregates['dates'], get_rows(aggregates), 'downloads',
+                                     'Daily Usage Evolution', 'Usage', min_downloads=YELLOW_GRAPH_MIN_USAGE)
+
+
+@app.callback(
+    Output('file-selector', 'value'),
+    [Input('url', 'search')],
+    [State('file-selector', 'options')]
+)
+def select_from_url(search: Optional[str], file_options: List[Dict[str, str]]):
+    # e.g. ?file=yellow2024-05-31.json
+    return get_url_selections(search, {'file': {option['label']: option['value'] for option in file_options}})[0]
 
 
 @app.callback(
     Output('report-content', 'children'),
-    Input('file-selector', 'value')
+    [Input('file-selector', 'value'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
 )
-def update_yellow_report(selected_file: str):
+def update_yellow_report(selected_file: str, start_date: Optional[str], end_date: Optional[str]):
     selected_organization = 'MULTIVERSX'
     organization = EcosystemConfiguration[selected_organization.upper()].value
-    fetcher = ElasticSearchFetcher.from_generated_file(selected_file, organization)
+    aggregates = load_report_aggregates(ElasticSearchFetcher, report_type, selected_file, organization, start_date, end_date)
     return html.Div([
         dcc.Tabs([
             dcc.Tab(label=section.replace('_', ' '), id=section, style={'font-weight': 'normal'},
                     selected_style={'font-weight': 'bold'}, children=[
                 html.H1(f"{organization.name} - {section.replace('_', ' ')} - API User Agent Access Details"),
                 html.H2('Access Data Table'),
-                create_table(fetcher, section),
+                create_table(aggregates, section),
 
                 html.H2('Access Trends'),
                 html.Div([
                     dcc.Graph(
                         id='downloads-graph',
-                        figure=create_graph(fetcher, section)
+                        figure=create_graph(aggregates, section)
                     ),
                 ], style={'display': 'inline-block', 'width': '100%'}),
             ])
@@ -155,5 +168,26 @@ def update_yellow_report(selected_file: str):
     ])
 
 
+@app.callback(
+    [Output('downloads_table', 'data'),
+     Output('downloads_table', 'page_count'),
+     Output('downloads_table', 'page_current')],
+    [Input('downloads_table', 'page_current'),
+     Input('downloads_table', 'page_size'),
+     Input('downloads_table', 'sort_by'),
+     Input('downloads_table', 'filter_query')],
+    [State('file-selector', 'value'),
+     State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('url', 'search')]
+)
+def update_yellow_table(page_current: int, page_size: int, sort_by: List[Dict[str, str]], filter_query: str,
+                        selected_file: str, start_date: Optional[str], end_date: Optional[str], search: Optional[str]):
+    organization = EcosystemConfiguration.MULTIVERSX.value
+    aggregates = load_report_aggregates(ElasticSearchFetcher, report_type, selected_file, organization, start_date, end_date)
+    # the pdf export prints every row
+    return get_table_page(create_table_records(aggregates), page_current, None if is_print_mode(search) else page_size, sort_by, filter_query)
+
+
 if __name__ == '__main__':
     app.run_server(debug=False, port=report_type.repo_port, host='0.0.0.0')
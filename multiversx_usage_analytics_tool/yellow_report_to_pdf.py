@@ -1,59 +1,19 @@
 import asyncio
-import os
 import tempfile
 from pathlib import Path
 from typing import List
 
-from playwright.async_api import async_playwright
-
-from multiversx_usage_analytics_tool.constants import \
-    WAIT_FOR_TABS_COMPONENT_LOAD
-from multiversx_usage_analytics_tool.utils import (Reports, combine_pdfs,
+from multiversx_usage_analytics_tool.utils import (Reports, ReportView,
+                                                   capture_report_pdfs,
+                                                   combine_pdfs,
                                                    get_environment_var,
-                                                   get_playwright_page,
-                                                   is_empty_page,
-                                                   select_report,
                                                    select_target_json_file)
 
 
 async def capture_pdfs(temp_dir: str, selected_file: str) -> List[str]:
-    wait_for_tabs_content_to_load_time = WAIT_FOR_TABS_COMPONENT_LOAD
-
-    tab_ids = ['Grouped_data']
-
-    # open report page
-    async with async_playwright() as p:
-        browser, page = await get_playwright_page(p, Reports.YELLOW.value)
-
-        # click on selected file
-        output = await select_report(page, selected_file)
-        pdf_files = [output]
-
-        # Loop through each tab (package registry)
-        for tab_id in tab_ids:
-            await page.click(f'#{tab_id}')
-            await page.wait_for_selector(f'#{tab_id}')
-            await page.wait_for_timeout(wait_for_tabs_content_to_load_time)
-
-            is_empty = await is_empty_page(page)
-            if is_empty:
-                print(f"Empty PDF for tab {tab_id}: not saved")
-                continue
-
-            # Save each tab's content as a PDF
-            pdf_file = os.path.join(temp_dir, f'report_{tab_id}.pdf')
-            pdf_files.append(pdf_file)
-
-            await page.pdf(
-                path=pdf_file,
-                format='A4',
-                landscape=True,
-                print_background=True,
-            )
-            print(f"Saved PDF for tab {tab_id}: {pdf_file}")
+    views = [ReportView({}, 'tab Grouped_data')]
 
-        await browser.close()
-    return pdf_files
+    return await capture_report_pdfs(Reports.YELLOW.value, temp_dir, selected_file, views)
 
 
 async def export_dash_report_to_pdf(selected_file: str = ''):